@@ -17,6 +17,9 @@ class User(AbstractUser):
         ADMIN = 'admin', _('Administrator')
         ORG_ADMIN = 'org_admin', _('Organization Administrator')
     
+    # Plain-string role values, so membership is a single hash lookup on the stored role
+    TEACHING_ROLES = frozenset({Role.INSTRUCTOR.value, Role.MENTOR.value, Role.TA.value})
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     email = models.EmailField(_('email address'), unique=True)
     role = models.CharField(max_length=20, choices=Role.choices, default=Role.STUDENT)
@@ -114,7 +117,7 @@ class User(AbstractUser):
     
     @property
     def can_teach(self):
-        return self.role in [self.Role.INSTRUCTOR, self.Role.MENTOR, self.Role.TA]
+        return self.role in self.TEACHING_ROLES
 
 
 class Organization(models.Model):
@@ -0,0 +1,13 @@
+# accounts/signals.py
+"""Profile bootstrap for the accounts app"""
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import User, UserProfile
+
+
+@receiver(post_save, sender=User)
+def create_profile(sender, instance, created, raw=False, **kwargs):
+    """Give every new user a profile so hot paths can update it without a lookup"""
+    if created and not raw:
+        UserProfile.objects.get_or_create(user=instance)
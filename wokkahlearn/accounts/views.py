@@ -78,9 +78,6 @@ class RegisterView(generics.CreateAPIView):
         user.is_verified = False
         user.save()
         
-        # Create associated user profile
-        UserProfile.objects.create(user=user)
-        
         # Generate email verification token
         verification_token = EmailVerificationToken.objects.create(user=user)
         
@@ -1,7 +1,9 @@
 import pytest
 from django.urls import reverse
+from django.core.cache import cache
 from rest_framework import status
-from courses.models import Course, CourseEnrollment
+from courses.models import Course, CourseEnrollment, CourseRating
+from courses.serializers import CourseSerializer, _fields_version
 
 
 @pytest.mark.django_db
@@ -60,4 +62,91 @@ class TestCoursesAPI:
         
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data['results']) == 1
+    
+    def test_rate_course_updates_totals(self, authenticated_client, course, user):
+        CourseEnrollment.objects.create(student=user, course=course)
+        url = reverse('course-rate', kwargs={'pk': course.id})
+        
+        response = authenticated_client.post(url, {'rating': 4, 'review': 'Good'})
+        assert response.status_code == status.HTTP_201_CREATED
+        course.refresh_from_db()
+        assert (course.rating_sum, course.total_reviews) == (4, 1)
+        
+        # Rating again edits the student's rating instead of adding a review
+        response = authenticated_client.post(url, {'rating': 2})
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['review'] == 'Good'
+        course.refresh_from_db()
+        assert (course.rating_sum, course.total_reviews) == (2, 1)
+        assert CourseRating.objects.filter(student=user, course=course).count() == 1
+    
+    def test_edit_rating_through_ratings_endpoint(self, authenticated_client, course, user):
+        rating = CourseRating.objects.create(student=user, course=course, rating=5)
+        url = reverse('course-rating-detail', kwargs={'pk': rating.id})
+        
+        response = authenticated_client.patch(url, {'rating': 3})
+        assert response.status_code == status.HTTP_200_OK
+        course.refresh_from_db()
+        assert (course.rating_sum, course.total_reviews) == (3, 1)
+        
+        response = authenticated_client.delete(url)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        course.refresh_from_db()
+        assert (course.rating_sum, course.total_reviews) == (0, 0)
+    
+    def test_instructor_action_on_visible_course_is_forbidden(self, authenticated_client, course):
+        url = reverse('course-analytics', kwargs={'pk': course.id})
+        response = authenticated_client.get(url)
+        
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert response.data == {'error': 'Permission denied'}
+    
+    def test_instructor_action_on_hidden_course_is_not_found(self, authenticated_client, course):
+        Course.objects.filter(pk=course.pk).update(status='draft')
+        url = reverse('course-analytics', kwargs={'pk': course.id})
+        response = authenticated_client.get(url)
+        
+        assert response.status_code == status.HTTP_404_NOT_FOUND
 
+
+@pytest.mark.django_db
+class TestCourseSerializerCache:
+    
+    @pytest.fixture(autouse=True)
+    def locmem_cache(self, settings):
+        # The test settings use the dummy cache, which never hits
+        settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    
+    def test_cached_row_missing_a_field_is_a_miss(self, course):
+        version = _fields_version(CourseSerializer)
+        key = f'course:{version}:{course.pk}:{course.updated_at.timestamp()}:'
+        cache.set(key, {'id': str(course.pk), 'title': 'Stale title'})
+        
+        data = CourseSerializer(course).data
+        
+        assert data['title'] == course.title
+        assert 'tags' in cache.get(key)
+    
+    def test_cache_key_tracks_the_field_list(self):
+        class ExtendedCourseSerializer(CourseSerializer):
+            class Meta(CourseSerializer.Meta):
+                fields = [*CourseSerializer.Meta.fields, 'updated_at']
+        
+        assert _fields_version(ExtendedCourseSerializer) != _fields_version(CourseSerializer)
+    
+    def test_nested_rows_render_fresh_on_a_hit(self, course):
+        CourseSerializer(course).data
+        type(course.instructor).objects.filter(pk=course.instructor_id).update(first_name='Renamed')
+        
+        course = Course.objects.select_related('instructor', 'category').get(pk=course.pk)
+        data = CourseSerializer(course).data
+        
+        assert data['instructor']['full_name'].startswith('Renamed')
+    
+    def test_structure_changes_bump_the_course_version(self, course):
+        before = course.updated_at
+        
+        course.modules.create(title="New Module", order=1, estimated_duration="1:00:00")
+        
+        course.refresh_from_db(fields=['updated_at'])
+        assert course.updated_at > before
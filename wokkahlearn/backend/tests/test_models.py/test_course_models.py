@@ -1,6 +1,8 @@
 import pytest
+from decimal import Decimal
+from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from courses.models import Course, CourseEnrollment, LessonProgress
+from courses.models import Course, CourseEnrollment, CourseRating, LessonProgress
 
 
 @pytest.mark.django_db
@@ -64,3 +66,78 @@ class TestCourseModels:
         
         assert course.slug == "test-course-with-spaces"
 
+
+@pytest.mark.django_db
+class TestCourseRatingTotals:
+    
+    @pytest.fixture
+    def other_student(self):
+        return get_user_model().objects.create_user(
+            email="second@example.com",
+            username="second",
+            first_name="Second",
+            last_name="Student",
+            password="testpass123"
+        )
+    
+    def assert_totals(self, course, rating_sum, total_reviews, average_rating):
+        course.refresh_from_db(fields=['rating_sum', 'total_reviews', 'average_rating'])
+        assert course.rating_sum == rating_sum
+        assert course.total_reviews == total_reviews
+        assert course.average_rating == Decimal(average_rating)
+    
+    def test_create_adds_to_totals(self, course, user, other_student):
+        CourseRating.objects.create(student=user, course=course, rating=4)
+        CourseRating.objects.create(student=other_student, course=course, rating=5)
+        
+        self.assert_totals(course, 9, 2, '4.50')
+    
+    def test_edit_applies_the_difference(self, course, user, other_student):
+        rating = CourseRating.objects.create(student=user, course=course, rating=4)
+        CourseRating.objects.create(student=other_student, course=course, rating=5)
+        
+        rating.rating = 1
+        rating.save()
+        self.assert_totals(course, 6, 2, '3.00')
+        
+        rating.review = "Changed my mind"
+        rating.save(update_fields=['review', 'updated_at'])
+        self.assert_totals(course, 6, 2, '3.00')
+    
+    def test_delete_removes_from_totals(self, course, user, other_student):
+        rating = CourseRating.objects.create(student=user, course=course, rating=2)
+        CourseRating.objects.create(student=other_student, course=course, rating=5)
+        
+        rating.delete()
+        self.assert_totals(course, 5, 1, '5.00')
+        
+        CourseRating.objects.get(student=other_student).delete()
+        self.assert_totals(course, 0, 0, '0.00')
+    
+    def test_moving_a_rating_between_courses(self, course, user, instructor):
+        other_course = Course.objects.create(
+            title="Another Course",
+            instructor=instructor,
+            category=course.category,
+            description="Test description",
+            short_description="Short desc",
+            difficulty_level=Course.DifficultyLevel.BEGINNER,
+            estimated_duration="30:00:00"
+        )
+        rating = CourseRating.objects.create(student=user, course=course, rating=3)
+        
+        rating.course = other_course
+        rating.save()
+        self.assert_totals(course, 0, 0, '0.00')
+        self.assert_totals(other_course, 3, 1, '3.00')
+    
+    def test_totals_match_a_full_recount(self, course, user, other_student):
+        rating = CourseRating.objects.create(student=user, course=course, rating=5)
+        CourseRating.objects.create(student=other_student, course=course, rating=2)
+        rating.rating = 4
+        rating.save()
+        
+        course.refresh_from_db()
+        running = (course.rating_sum, course.total_reviews, course.average_rating)
+        course.update_rating_stats()
+        assert running == (course.rating_sum, course.total_reviews, course.average_rating)
@@ -0,0 +1,27 @@
+import pytest
+
+from courses.models import LessonProgress
+from utils.pagination import count_cache_version, invalidate_counts
+
+
+@pytest.mark.django_db
+class TestCountInvalidation:
+    
+    @pytest.fixture(autouse=True)
+    def locmem_cache(self, settings):
+        # The test settings use the dummy cache, which never hits
+        settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    
+    def test_version_is_stable_between_writes(self):
+        assert count_cache_version(LessonProgress) == count_cache_version(LessonProgress)
+    
+    def test_invalidation_waits_for_commit(self, django_capture_on_commit_callbacks):
+        before = count_cache_version(LessonProgress)
+        
+        with django_capture_on_commit_callbacks() as callbacks:
+            invalidate_counts(LessonProgress)
+            assert count_cache_version(LessonProgress) == before
+        
+        for callback in callbacks:
+            callback()
+        assert count_cache_version(LessonProgress) != before
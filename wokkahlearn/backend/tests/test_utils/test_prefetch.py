@@ -0,0 +1,26 @@
+from courses.serializers import (
+    CourseSerializer, CourseEnrollmentSerializer, CreateCourseSerializer
+)
+from utils.prefetch import related_lookups
+
+
+class TestRelatedLookups:
+    
+    def test_course_serializer_lookups(self):
+        select, prefetch = related_lookups(CourseSerializer)
+        
+        assert select == ('category', 'instructor')
+        assert prefetch == ('co_instructors',)
+    
+    def test_nested_serializer_lookups_are_prefixed(self):
+        select, prefetch = related_lookups(CourseEnrollmentSerializer)
+        
+        assert 'course__instructor' in select
+        assert 'student' in select
+        assert 'course__co_instructors' in prefetch
+    
+    def test_primary_key_relations_are_skipped(self):
+        select, prefetch = related_lookups(CreateCourseSerializer)
+        
+        assert select == ()
+        assert prefetch == ()
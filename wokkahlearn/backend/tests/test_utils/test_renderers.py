@@ -0,0 +1,72 @@
+import json
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from utils.renderers import ORJSON_AVAILABLE, FastJSONRenderer, stream_csv, stream_json_array
+
+requires_orjson = pytest.mark.skipif(not ORJSON_AVAILABLE, reason="orjson not installed")
+
+
+class TestFastJSONRenderer:
+    
+    def render(self, data, **kwargs):
+        return FastJSONRenderer().render(data, **kwargs)
+    
+    def test_matches_the_stock_renderer(self):
+        data = {
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'price': Decimal('4.50'),
+            'label': gettext_lazy('Course'),
+            'created_at': datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            'tags': ('python', 'django'),
+        }
+        
+        assert json.loads(self.render(data)) == json.loads(JSONRenderer().render(data))
+    
+    @requires_orjson
+    def test_decimal_and_lazy_string_fall_back_to_the_drf_encoder(self):
+        data = json.loads(self.render({'price': Decimal('4.50'), 'label': gettext_lazy('Course')}))
+        
+        assert data == {'price': 4.5, 'label': 'Course'}
+    
+    @requires_orjson
+    def test_utc_datetimes_use_the_z_suffix(self):
+        rendered = self.render({'at': datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)})
+        
+        assert rendered == b'{"at":"2026-01-02T03:04:05Z"}'
+    
+    def test_line_separators_are_escaped(self):
+        rendered = self.render({'text': 'a\u2028b\u2029c'})
+        
+        assert b'\\u2028' in rendered
+        assert b'\\u2029' in rendered
+        assert json.loads(rendered) == {'text': 'a\u2028b\u2029c'}
+    
+    def test_none_renders_empty(self):
+        assert self.render(None) == b''
+    
+    def test_indented_output_uses_the_stock_encoder(self):
+        rendered = self.render(
+            {'a': 1}, accepted_media_type='application/json; indent=2', renderer_context={}
+        )
+        
+        assert rendered == b'{\n  "a": 1\n}'
+
+
+class TestStreaming:
+    
+    def test_json_array(self):
+        chunks = list(stream_json_array([{'a': 1}, {'a': 2}]))
+        
+        assert json.loads(b''.join(chunks)) == [{'a': 1}, {'a': 2}]
+        assert b''.join(stream_json_array([])) == b'[]'
+    
+    def test_csv(self):
+        chunks = list(stream_csv(('name', 'score'), [('Ada', 90), ('Bob, Jr.', 75)]))
+        
+        assert chunks == ['name,score\r\n', 'Ada,90\r\n', '"Bob, Jr.",75\r\n']
@@ -0,0 +1,70 @@
+from datetime import datetime, timezone as dt_timezone
+
+from rest_framework import serializers
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from courses.models import CourseRating
+from courses.serializers import CourseRatingSerializer
+
+
+class TestFastListSerializer:
+    
+    def _ratings(self):
+        created = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        return [
+            CourseRating(id=1, rating=5, review='Great', created_at=created, updated_at=created),
+            CourseRating(id=2, rating=3, review='', created_at=created, updated_at=created),
+        ]
+    
+    def test_matches_stock_list_serializer(self):
+        ratings = self._ratings()
+        fast = CourseRatingSerializer(ratings, many=True).data
+        stock = serializers.ListSerializer(child=CourseRatingSerializer(), instance=ratings).data
+        
+        assert [dict(row) for row in fast] == [dict(row) for row in stock]
+        assert list(fast[0]) == CourseRatingSerializer.Meta.fields
+    
+    def test_iter_representation_yields_rows(self):
+        serializer = CourseRatingSerializer(many=True)
+        rows = serializer.iter_representation(self._ratings())
+        
+        assert next(rows)['rating'] == 5
+        assert next(rows)['review'] == ''
+
+
+class TestCachedFieldsMixin:
+    
+    def test_instances_get_their_own_fields(self):
+        from courses.serializers import CourseSerializer
+        
+        first, second = CourseSerializer(), CourseSerializer()
+        
+        assert list(first.fields) == list(second.fields)
+        assert first.fields['title'] is not second.fields['title']
+        assert first.fields['title'].parent is first
+        assert first.fields['co_instructors'].child is not second.fields['co_instructors'].child
+
+
+class TestSparseFieldsMixin:
+    
+    def _context(self, query):
+        return {'request': Request(APIRequestFactory().get('/api/courses/', query))}
+    
+    def test_keeps_only_requested_fields(self):
+        from courses.serializers import CourseSerializer
+        
+        serializer = CourseSerializer(context=self._context({'fields': 'title,id,unknown'}))
+        
+        assert list(serializer.fields) == ['id', 'title']
+    
+    def test_nested_and_unfiltered_serializers_keep_every_field(self):
+        from courses.serializers import CourseSerializer
+        
+        unfiltered = CourseSerializer(context=self._context({}))
+        serializer = CourseSerializer(many=True, context=self._context({'fields': 'id,instructor'}))
+        instructor = serializer.child.fields['instructor']
+        
+        assert list(unfiltered.fields) == CourseSerializer.Meta.fields
+        assert list(serializer.child.fields) == ['id', 'instructor']
+        assert list(instructor.fields) == instructor.Meta.fields
@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class CoursesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'courses'
+
+    def ready(self):
+        from django.urls import get_resolver
+
+        from . import signals  # noqa: F401
+
+        # Build the reverse lookup tables at startup instead of on the first request. Under
+        # gunicorn --preload the populated tables are shared copy-on-write across workers;
+        # the dev autoreloader re-imports on every change, so it is skipped there
+        if not settings.DEBUG:
+            get_resolver()._populate()
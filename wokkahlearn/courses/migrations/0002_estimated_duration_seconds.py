@@ -0,0 +1,30 @@
+from django.db import migrations, models
+
+
+def populate_duration_seconds(apps, schema_editor):
+    for model_name in ('Course', 'Lesson'):
+        model = apps.get_model('courses', model_name)
+        for pk, duration in model.objects.values_list('pk', 'estimated_duration').iterator():
+            seconds = duration.days * 86400 + duration.seconds if duration else 0
+            model.objects.filter(pk=pk).update(estimated_duration_seconds=seconds)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='estimated_duration_seconds',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='estimated_duration_seconds',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_duration_seconds, migrations.RunPython.noop),
+    ]
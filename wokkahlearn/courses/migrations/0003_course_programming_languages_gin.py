@@ -0,0 +1,30 @@
+from django.db import migrations
+
+INDEX_NAME = 'courses_course_prog_langs_gin'
+
+
+def create_index(apps, schema_editor):
+    # jsonb containment indexes are PostgreSQL-only; the SQLite dev fallback filters without one
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON courses_course '
+        'USING gin (programming_languages jsonb_path_ops)'
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_estimated_duration_seconds'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,43 @@
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.db.models.functions import Cast
+
+INDEX_NAME = 'courses_course_search_gin'
+SEARCH_FIELDS = (('title', 'A'), ('tags', 'B'), ('skills_gained', 'B'), ('description', 'C'))
+
+
+def populate_search_vector(apps, schema_editor):
+    # tsvector columns and GIN indexes are PostgreSQL-only; other backends keep icontains search
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    vector = None
+    for name, weight in SEARCH_FIELDS:
+        part = SearchVector(Cast(name, models.TextField()), weight=weight, config='english')
+        vector = part if vector is None else vector + part
+    apps.get_model('courses', 'Course').objects.update(search_vector=vector)
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON courses_course USING gin (search_vector)'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_course_programming_languages_gin'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(populate_search_vector, drop_search_index),
+    ]
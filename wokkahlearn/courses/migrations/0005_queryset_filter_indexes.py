@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_course_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['status', '-created_at'], name='courses_cou_status_41eebb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['instructor', 'status'], name='courses_cou_instruc_98570d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='courseenrollment',
+            index=models.Index(fields=['course', 'student', 'status'], name='courses_cou_course__327841_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lessonprogress',
+            index=models.Index(fields=['enrollment', 'status'], name='courses_les_enrollm_4c2337_idx'),
+        ),
+    ]
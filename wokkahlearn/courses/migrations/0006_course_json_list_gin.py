@@ -0,0 +1,35 @@
+from django.db import migrations
+
+INDEXED_COLUMNS = {
+    'courses_course_skills_gin': 'skills_gained',
+    'courses_course_tags_gin': 'tags',
+}
+
+
+def create_indexes(apps, schema_editor):
+    # jsonb containment indexes are PostgreSQL-only; the SQLite dev fallback filters without one
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name, column in INDEXED_COLUMNS.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} ON courses_course '
+            f'USING gin ({column} jsonb_path_ops)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name in INDEXED_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_queryset_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations, models
+from django.db.models import Avg, Count, Sum
+
+
+def populate_rating_sum(apps, schema_editor):
+    # total_reviews was never maintained before, so backfill every running total together
+    Course = apps.get_model('courses', 'Course')
+    CourseRating = apps.get_model('courses', 'CourseRating')
+    rating_field = Course._meta.get_field('average_rating')
+    totals = CourseRating.objects.order_by().values('course_id').annotate(
+        total=Sum('rating'), count=Count('pk'), avg=Avg('rating')
+    )
+    for row in totals.iterator():
+        Course.objects.filter(pk=row['course_id']).update(
+            rating_sum=row['total'],
+            total_reviews=row['count'],
+            average_rating=rating_field.to_python(row['avg'])
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_course_json_list_gin'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_rating_sum, migrations.RunPython.noop),
+    ]
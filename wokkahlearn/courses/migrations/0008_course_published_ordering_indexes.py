@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_course_rating_sum'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(
+                condition=models.Q(('status', 'published')), fields=['-average_rating'],
+                name='course_pub_rating'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(
+                condition=models.Q(('status', 'published')), fields=['-total_enrollments'],
+                name='course_pub_enrollments'
+            ),
+        ),
+    ]
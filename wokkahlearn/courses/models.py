@@ -1,16 +1,31 @@
 # courses/models.py
 import uuid
 from datetime import timedelta
-from django.db import models
+from django.core.cache import cache
+from django.db import connection, models
+from django.db.models import Avg, Count, F, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.utils.text import slugify
+from django.utils.dateparse import parse_duration
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.urls import reverse
 
 User = get_user_model()
 
 
+def duration_to_seconds(duration):
+    """Whole seconds in a duration, using integer arithmetic only"""
+    if isinstance(duration, str):
+        duration = parse_duration(duration)
+    if not duration:
+        return 0
+    return duration.days * 86400 + duration.seconds
+
+
 class CourseCategory(models.Model):
     """Categories for organizing courses"""
     
@@ -43,6 +58,48 @@ class CourseCategory(models.Model):
         if not self.slug:
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
+    
+    @classmethod
+    def get_subtree(cls, root_ids):
+        """Active descendants of the given categories, fetched with one recursive query
+        
+        Each row carries ``course_count``, the number of published courses in it.
+        """
+        if not root_ids:
+            return []
+        table = cls._meta.db_table
+        course_table = Course._meta.db_table
+        pk_field = cls._meta.pk
+        params = [pk_field.get_db_prep_value(pk, connection) for pk in root_ids]
+        placeholders = ', '.join(['%s'] * len(params))
+        return cls.objects.raw(f"""
+            WITH RECURSIVE subtree AS (
+                SELECT * FROM {table} WHERE parent_id IN ({placeholders}) AND is_active = %s
+                UNION ALL
+                SELECT c.* FROM {table} c
+                INNER JOIN subtree s ON c.parent_id = s.id
+                WHERE c.is_active = %s
+            )
+            SELECT subtree.*, (
+                SELECT COUNT(*) FROM {course_table}
+                WHERE {course_table}.category_id = subtree.id AND {course_table}.status = %s
+            ) AS course_count
+            FROM subtree
+            ORDER BY subtree."order", subtree.name
+        """, params + [True, True, 'published'])
+
+
+# Columns folded into Course.search_vector, with their full-text weights
+COURSE_SEARCH_FIELDS = (('title', 'A'), ('tags', 'B'), ('skills_gained', 'B'), ('description', 'C'))
+
+
+def course_search_vector():
+    """Expression computing a course's full-text search vector"""
+    vector = None
+    for name, weight in COURSE_SEARCH_FIELDS:
+        part = SearchVector(Cast(name, models.TextField()), weight=weight, config='english')
+        vector = part if vector is None else vector + part
+    return vector
 
 
 class Course(models.Model):
@@ -81,6 +138,7 @@ class Course(models.Model):
     
     # Course structure
     estimated_duration = models.DurationField(help_text="Total estimated course duration")
+    estimated_duration_seconds = models.PositiveIntegerField(default=0, editable=False)
     learning_objectives = models.JSONField(default=list, help_text="List of learning objectives")
     skills_gained = models.JSONField(default=list, help_text="Skills students will gain")
     tags = models.JSONField(default=list, help_text="Course tags for search")
@@ -105,8 +163,12 @@ class Course(models.Model):
     total_enrollments = models.PositiveIntegerField(default=0)
     average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.0)
     total_reviews = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
     completion_rate = models.DecimalField(max_digits=5, decimal_places=2, default=0.0)
     
+    # Full-text search (PostgreSQL only); maintained by save()
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     published_at = models.DateTimeField(null=True, blank=True)
@@ -118,6 +180,17 @@ class Course(models.Model):
         indexes = [
             models.Index(fields=['status', 'difficulty_level']),
             models.Index(fields=['category', 'is_free']),
+            models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['instructor', 'status']),
+            # Public catalog orderings only ever scan published courses
+            models.Index(
+                fields=['-average_rating'], name='course_pub_rating',
+                condition=models.Q(status='published')
+            ),
+            models.Index(
+                fields=['-total_enrollments'], name='course_pub_enrollments',
+                condition=models.Q(status='published')
+            ),
         ]
     
     def __str__(self):
@@ -126,7 +199,15 @@ class Course(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        self.estimated_duration_seconds = duration_to_seconds(self.estimated_duration)
         super().save(*args, **kwargs)
+        
+        update_fields = kwargs.get('update_fields')
+        searched = {name for name, weight in COURSE_SEARCH_FIELDS}
+        if connection.vendor == 'postgresql' and (
+            update_fields is None or searched & set(update_fields)
+        ):
+            Course.objects.filter(pk=self.pk).update(search_vector=course_search_vector())
     
     @property
     def is_published(self):
@@ -134,15 +215,11 @@ class Course(models.Model):
     
     @property
     def total_lessons(self):
-        return sum(module.lessons.count() for module in self.modules.all())
+        return Lesson.objects.filter(module__course=self).count()
     
     @property
     def total_exercises(self):
-        return sum(
-            lesson.exercises.count() 
-            for module in self.modules.all() 
-            for lesson in module.lessons.all()
-        )
+        return Exercise.objects.filter(lesson__module__course=self).count()
     
     def can_enroll(self, user):
         """Check if user can enroll in this course"""
@@ -158,8 +235,54 @@ class Course(models.Model):
         
         return True
     
+    def adjust_enrollments(self, delta):
+        """Atomically add ``delta`` to total_enrollments"""
+        Course.objects.filter(pk=self.pk).update(
+            total_enrollments=F('total_enrollments') + delta,
+            updated_at=timezone.now()
+        )
+        self.refresh_from_db(fields=['total_enrollments', 'updated_at'])
+    
+    def update_rating_stats(self):
+        """Recompute the rating totals from one aggregate over the ratings"""
+        stats = CourseRating.objects.filter(course_id=self.pk).aggregate(
+            avg=Avg('rating'), count=Count('pk'), total=Sum('rating')
+        )
+        self.average_rating = self._meta.get_field('average_rating').to_python(stats['avg'] or 0)
+        self.total_reviews = stats['count']
+        self.rating_sum = stats['total'] or 0
+        self.updated_at = timezone.now()
+        Course.objects.filter(pk=self.pk).update(
+            average_rating=self.average_rating,
+            total_reviews=self.total_reviews,
+            rating_sum=self.rating_sum,
+            updated_at=self.updated_at
+        )
+    
+    @staticmethod
+    def adjust_rating_totals(course_id, sum_delta, count_delta):
+        """Fold one rating change into the running totals in a single UPDATE"""
+        rating_sum = F('rating_sum') + sum_delta
+        total_reviews = F('total_reviews') + count_delta
+        rating_field = Course._meta.get_field('average_rating')
+        Course.objects.filter(pk=course_id).update(
+            rating_sum=rating_sum,
+            total_reviews=total_reviews,
+            # SET expressions all read the pre-update row, so the average repeats the deltas.
+            # The sum is divided as a float (SQLite keeps a decimal cast an INTEGER and would
+            # truncate) and then cast back, rounding into the column's precision
+            average_rating=Coalesce(
+                Cast(
+                    Cast(rating_sum, models.FloatField()) / NullIf(total_reviews, 0),
+                    rating_field
+                ),
+                Value(0), output_field=rating_field
+            ),
+            updated_at=timezone.now()
+        )
+    
     def get_absolute_url(self):
-        return reverse('course-detail', kwargs={'slug': self.slug})
+        return reverse('course-detail', kwargs={'pk': self.pk})
        
 
 
@@ -219,6 +342,7 @@ class Lesson(models.Model):
     # Lesson structure
     order = models.PositiveIntegerField(default=0)
     estimated_duration = models.DurationField()
+    estimated_duration_seconds = models.PositiveIntegerField(default=0, editable=False)
     
     # Settings
     is_preview = models.BooleanField(default=False, help_text="Available without enrollment")
@@ -249,6 +373,7 @@ class Lesson(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        self.estimated_duration_seconds = duration_to_seconds(self.estimated_duration)
         super().save(*args, **kwargs)
 
 
@@ -322,6 +447,10 @@ class Exercise(models.Model):
         return f"{self.lesson.title} - {self.title}"
 
 
+# Seconds CourseEnrollment.is_enrolled remembers a (student, course) answer
+ENROLLMENT_CACHE_TIMEOUT = 60 * 5
+
+
 class CourseEnrollment(models.Model):
     """Track student enrollments in courses"""
     
@@ -364,10 +493,26 @@ class CourseEnrollment(models.Model):
         verbose_name_plural = _('Course Enrollments')
         unique_together = ['student', 'course']
         ordering = ['-enrolled_at']
+        indexes = [
+            models.Index(fields=['course', 'student', 'status']),
+        ]
     
     def __str__(self):
         return f"{self.student.username} - {self.course.title}"
     
+    @staticmethod
+    def cache_key(student_id, course_id):
+        return f'enrolled:{student_id}:{course_id}'
+    
+    @classmethod
+    def is_enrolled(cls, student_id, course_id):
+        """Whether the student is enrolled in the course, cached per pair"""
+        return cache.get_or_set(
+            cls.cache_key(student_id, course_id),
+            lambda: cls.objects.filter(student_id=student_id, course_id=course_id).exists(),
+            ENROLLMENT_CACHE_TIMEOUT
+        )
+    
     def update_progress(self):
         """Update progress based on completed lessons and exercises"""
         total_lessons = self.course.total_lessons
@@ -419,6 +564,9 @@ class LessonProgress(models.Model):
         verbose_name_plural = _('Lesson Progress')
         unique_together = ['enrollment', 'lesson']
         ordering = ['lesson__order']
+        indexes = [
+            models.Index(fields=['enrollment', 'status']),
+        ]
     
     def __str__(self):
         return f"{self.enrollment.student.username} - {self.lesson.title}"
@@ -1,8 +1,19 @@
 # courses/serializers.py
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from django.db.models import Avg, Count, Sum
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Avg, Case, Count, F, IntegerField, Max, Prefetch, Sum, When, Window
+from django.db.models.functions import Coalesce, RowNumber
+from django.utils import timezone
+from django.utils.functional import cached_property
 from datetime import timedelta
+from functools import lru_cache
+import zlib
+
+from utils.serializers import (
+    CachedFieldsMixin, ContextCachedSerializer, FastListSerializer, SparseFieldsMixin
+)
 
 from .models import (
     CourseCategory, Course, Module, Lesson, Exercise,
@@ -11,17 +22,81 @@ from .models import (
 
 User = get_user_model()
 
+COURSE_CACHE_TIMEOUT = 60 * 10
+
+
+@lru_cache(maxsize=1024)
+def _fmt_duration(seconds):
+    """Format a whole number of seconds as e.g. '2h 15m' or '45m'"""
+    if not seconds:
+        return "N/A"
+    hours, remainder = divmod(seconds, 3600)
+    minutes = remainder // 60
+    if hours > 0:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m"
+
 
 # User serializer for course context
+# User columns CourseUserSerializer reads; get_full_name needs the name parts
+COURSE_USER_COLUMNS = frozenset({
+    'id', 'username', 'first_name', 'last_name', 'avatar', 'bio', 'role'
+})
+
+
+@lru_cache(maxsize=None)
+def _fields_version(serializer_class):
+    """Stable tag of a serializer's field list, so cached rows never outlive a schema change"""
+    return format(zlib.crc32(','.join(serializer_class.Meta.fields).encode()), '08x')
+
+
+@lru_cache(maxsize=None)
+def _unrendered_user_columns(prefix):
+    """Lookups deferring every user column CourseUserSerializer doesn't render"""
+    return tuple(
+        f'{prefix}__{field.name}' for field in User._meta.concrete_fields
+        if field.name not in COURSE_USER_COLUMNS
+    )
+
+
 class CourseUserSerializer(serializers.ModelSerializer):
     full_name = serializers.CharField(source='get_full_name', read_only=True)
     
     class Meta:
         model = User
         fields = ['id', 'username', 'full_name', 'avatar', 'bio', 'role']
+    
+    def to_representation(self, instance):
+        # Instructors and students recur across rows; build each user's dict once
+        user_dicts = self.context.setdefault('_user_dicts', {})
+        if instance.pk not in user_dicts:
+            user_dicts[instance.pk] = super().to_representation(instance)
+        return dict(user_dicts[instance.pk])
 
 
 # Category Serializers
+def _preload_subtrees(context, category_ids):
+    """Map category id -> active child categories, cached in the serializer context"""
+    subtree_map = context.setdefault('_subtree_map', {})
+    missing = [category_id for category_id in category_ids if category_id not in subtree_map]
+    if missing:
+        subtree_map.update((category_id, []) for category_id in missing)
+        for category in CourseCategory.get_subtree(missing):
+            subtree_map.setdefault(category.pk, [])
+            subtree_map.setdefault(category.parent_id, []).append(category)
+    return subtree_map
+
+
+class CourseCategoryListSerializer(serializers.ListSerializer):
+    """Loads every listed category's subtree at once in tree view context"""
+    
+    def to_representation(self, data):
+        categories = list(data.all() if isinstance(data, models.Manager) else data)
+        if self.context.get('include_children', False):
+            _preload_subtrees(self.context, [category.pk for category in categories])
+        return super().to_representation(categories)
+
+
 class CourseCategorySerializer(serializers.ModelSerializer):
     course_count = serializers.SerializerMethodField()
     children = serializers.SerializerMethodField()
@@ -34,20 +109,77 @@ class CourseCategorySerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        list_serializer_class = CourseCategoryListSerializer
+    
+    def to_representation(self, instance):
+        # Course rows nest their category; count and build each category's dict once
+        category_dicts = self.context.setdefault('_category_dicts', {})
+        if instance.pk not in category_dicts:
+            category_dicts[instance.pk] = super().to_representation(instance)
+        return dict(category_dicts[instance.pk])
     
     def get_course_count(self, obj):
+        # Annotated by CourseCategoryViewSet and CourseCategory.get_subtree
+        if hasattr(obj, 'course_count'):
+            return obj.course_count
         return obj.course_set.filter(status='published').count()
     
     def get_children(self, obj):
         # Only include children in tree view context
         if self.context.get('include_children', False):
-            children = obj.coursecategory_set.filter(is_active=True)
+            children = _preload_subtrees(self.context, [obj.pk])[obj.pk]
             return CourseCategorySerializer(children, many=True, context=self.context).data
         return []
 
 
+def _preload_enrollments(context, user, course_ids):
+    """Map course id -> the user's enrollment (or None), cached in the serializer context"""
+    enrollment_map = context.setdefault('_enrollment_map', {})
+    missing = [course_id for course_id in course_ids if course_id not in enrollment_map]
+    if missing:
+        enrollment_map.update(dict.fromkeys(missing))
+        enrollment_map.update(
+            (enrollment.course_id, enrollment)
+            for enrollment in CourseEnrollment.objects.filter(student=user, course_id__in=missing)
+        )
+    return enrollment_map
+
+
+def _course_instructors(context, course_ids):
+    """Map course id -> instructor id, cached in the serializer context"""
+    instructor_map = context.setdefault('_course_instructors', {})
+    missing = [course_id for course_id in course_ids if course_id not in instructor_map]
+    if missing:
+        instructor_map.update(
+            Course.objects.filter(pk__in=missing).values_list('pk', 'instructor_id')
+        )
+    return instructor_map
+
+
+def _prerequisite_map(model, object_ids):
+    """Map object id -> prerequisite ids for a model's self-referential prerequisites"""
+    name = model._meta.model_name
+    prerequisites = {}
+    for object_id, prerequisite_id in model.prerequisites.through.objects.filter(
+        **{f'from_{name}_id__in': object_ids}
+    ).values_list(f'from_{name}_id', f'to_{name}_id'):
+        prerequisites.setdefault(object_id, set()).add(prerequisite_id)
+    return prerequisites
+
+
 # Course Serializers
-class CourseSerializer(serializers.ModelSerializer):
+class CourseListSerializer(serializers.ListSerializer):
+    """Preloads the requesting user's enrollments for every course in the list"""
+    
+    def to_representation(self, data):
+        courses = list(data.all() if isinstance(data, models.Manager) else data)
+        request = self.context.get('request')
+        if courses and request and request.user.is_authenticated:
+            _preload_enrollments(self.context, request.user, [course.pk for course in courses])
+        return super().to_representation(courses)
+
+
+class CourseSerializer(SparseFieldsMixin, CachedFieldsMixin, ContextCachedSerializer):
     instructor = CourseUserSerializer(read_only=True)
     category = CourseCategorySerializer(read_only=True)
     co_instructors = CourseUserSerializer(many=True, read_only=True)
@@ -56,6 +188,12 @@ class CourseSerializer(serializers.ModelSerializer):
     duration_formatted = serializers.SerializerMethodField()
     can_enroll = serializers.SerializerMethodField()
     
+    # Fields computed per request user; everything else is cached per course version
+    user_fields = ('is_enrolled', 'user_progress', 'can_enroll')
+    # Nested rows that change without touching the course; rendered from the joined rows
+    related_fields = ('instructor', 'co_instructors', 'category')
+    cache_public_fields = True
+    
     class Meta:
         model = Course
         fields = [
@@ -74,45 +212,118 @@ class CourseSerializer(serializers.ModelSerializer):
             'average_rating', 'total_enrollments', 'total_reviews',
             'completion_rate', 'created_at', 'published_at'
         ]
+        list_serializer_class = CourseListSerializer
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        # The instructor is joined in; only haul the columns its card renders
+        return queryset.defer(*_unrendered_user_columns('instructor'))
+    
+    @cached_property
+    def _uncached_field_names(self):
+        return frozenset(self.user_fields + self.related_fields)
+    
+    @cached_property
+    def _public_field_names(self):
+        return {
+            field.field_name for field in self._readable_fields
+            if field.field_name not in self._uncached_field_names
+        }
+    
+    def to_representation(self, instance):
+        # The public cache holds whole rows, so sparse renders bypass it
+        if not self.cache_public_fields or not instance.updated_at or self.sparse_fields:
+            return super().to_representation(instance)
+        
+        host = self._request.get_host() if self._request else ''
+        version = _fields_version(type(self))
+        key = f'course:{version}:{instance.pk}:{instance.updated_at.timestamp()}:{host}'
+        public = cache.get(key)
+        # A row missing a field (written by an older deploy) is a miss, not a KeyError
+        if public is None or not public.keys() >= self._public_field_names:
+            data = super().to_representation(instance)
+            cache.set(key, {
+                name: value for name, value in data.items()
+                if name not in self._uncached_field_names
+            }, COURSE_CACHE_TIMEOUT)
+            return data
+        
+        ret = {}
+        for field in self._readable_fields:
+            if field.field_name in self._uncached_field_names:
+                attribute = field.get_attribute(instance)
+                # Nullable relations (category) render as None, as Serializer does
+                ret[field.field_name] = (
+                    None if attribute is None else field.to_representation(attribute)
+                )
+            else:
+                ret[field.field_name] = public[field.field_name]
+        return ret
+    
+    def _get_enrollment(self, obj):
+        """The requesting user's enrollment, from the list preload when available"""
+        if self._is_auth:
+            return _preload_enrollments(self.context, self._user, [obj.pk])[obj.pk]
+        return None
     
     def get_is_enrolled(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.enrollments.filter(student=request.user).exists()
-        return False
+        # Querysets from CourseViewSet carry an Exists() annotation
+        if hasattr(obj, 'is_enrolled'):
+            return obj.is_enrolled
+        return self._get_enrollment(obj) is not None
     
     def get_user_progress(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            try:
-                enrollment = obj.enrollments.get(student=request.user)
-                return {
-                    'progress_percentage': enrollment.progress_percentage,
-                    'lessons_completed': enrollment.lessons_completed,
-                    'exercises_completed': enrollment.exercises_completed,
-                    'last_accessed': enrollment.last_accessed
-                }
-            except CourseEnrollment.DoesNotExist:
-                pass
+        enrollment = self._get_enrollment(obj)
+        if enrollment is not None:
+            return {
+                'progress_percentage': enrollment.progress_percentage,
+                'lessons_completed': enrollment.lessons_completed,
+                'exercises_completed': enrollment.exercises_completed,
+                'last_accessed': enrollment.last_accessed
+            }
         return None
     
     def get_duration_formatted(self, obj):
-        if obj.estimated_duration:
-            total_seconds = int(obj.estimated_duration.total_seconds())
-            hours = total_seconds // 3600
-            minutes = (total_seconds % 3600) // 60
-            if hours > 0:
-                return f"{hours}h {minutes}m"
-            return f"{minutes}m"
-        return "N/A"
+        return _fmt_duration(obj.estimated_duration_seconds)
     
     def get_can_enroll(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.can_enroll(request.user)
+        if self._is_auth:
+            # Memoized per request; the same course can appear as a row and a prerequisite
+            can_enroll_cache = self.context.setdefault('_can_enroll_cache', {})
+            if obj.pk not in can_enroll_cache:
+                can_enroll_cache[obj.pk] = obj.can_enroll(self._user)
+            return can_enroll_cache[obj.pk]
         return obj.is_free and obj.allow_enrollment
 
 
+def _preload_recent_enrollments(context, course_ids, limit=5):
+    """Map course id -> its latest enrollments, fetched with one windowed query"""
+    recent_map = context.setdefault('_recent_enroll', {})
+    missing = [course_id for course_id in course_ids if course_id not in recent_map]
+    if missing:
+        recent_map.update((course_id, []) for course_id in missing)
+        enrollments = CourseEnrollment.objects.filter(course_id__in=missing).annotate(
+            row_number=Window(
+                RowNumber(), partition_by=F('course_id'), order_by=F('enrolled_at').desc()
+            )
+        ).filter(row_number__lte=limit).select_related('student').order_by(
+            'course_id', 'row_number'
+        )
+        for enrollment in enrollments:
+            recent_map[enrollment.course_id].append(enrollment)
+    return recent_map
+
+
+class DetailedCourseListSerializer(CourseListSerializer):
+    """Also loads every listed course's recent enrollments at once"""
+    
+    def to_representation(self, data):
+        courses = list(data.all() if isinstance(data, models.Manager) else data)
+        if courses:
+            _preload_recent_enrollments(self.context, [course.pk for course in courses])
+        return super().to_representation(courses)
+
+
 class DetailedCourseSerializer(CourseSerializer):
     """Extended course serializer with modules and prerequisites"""
     modules = serializers.SerializerMethodField()
@@ -120,19 +331,39 @@ class DetailedCourseSerializer(CourseSerializer):
     required_skills = serializers.ListField(child=serializers.CharField(), read_only=True)
     recent_enrollments = serializers.SerializerMethodField()
     
+    cache_public_fields = False
+    
     class Meta(CourseSerializer.Meta):
         fields = CourseSerializer.Meta.fields + [
             'modules', 'prerequisites', 'required_skills', 
             'allow_enrollment', 'max_students', 'certificate_enabled',
             'discussion_enabled', 'recent_enrollments'
         ]
+        list_serializer_class = DetailedCourseListSerializer
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return super().setup_eager_loading(queryset).prefetch_related(Prefetch(
+            'modules',
+            queryset=Module.objects.order_by('order').prefetch_related(cls._lessons_prefetch()),
+            to_attr='_modules'
+        ))
+    
+    @staticmethod
+    def _lessons_prefetch():
+        return Prefetch(
+            'lessons', queryset=Lesson.objects.only('id', 'module_id'), to_attr='_lessons'
+        )
     
     def get_modules(self, obj):
-        modules = obj.modules.order_by('order')
+        if hasattr(obj, '_modules'):
+            modules = obj._modules
+        else:
+            modules = list(obj.modules.order_by('order').prefetch_related(self._lessons_prefetch()))
         return ModuleSerializer(modules, many=True, context=self.context).data
     
     def get_recent_enrollments(self, obj):
-        recent = obj.enrollments.order_by('-enrolled_at')[:5]
+        recent = _preload_recent_enrollments(self.context, [obj.pk])[obj.pk]
         return [{
             'student': enrollment.student.get_full_name() or enrollment.student.username,
             'enrolled_at': enrollment.enrolled_at
@@ -158,7 +389,91 @@ class CreateCourseSerializer(serializers.ModelSerializer):
 
 
 # Module Serializers
-class ModuleSerializer(serializers.ModelSerializer):
+def _preload_module_access(context, user, modules):
+    """Map module id -> whether the user can open it, cached in the serializer context"""
+    module_access = context.setdefault('_module_access', {})
+    modules = [module for module in modules if module.pk not in module_access]
+    if not modules:
+        return module_access
+    
+    course_ids = {module.course_id for module in modules}
+    instructors = _course_instructors(context, course_ids)
+    enrollment_map = _preload_enrollments(context, user, course_ids)
+    prerequisites = _prerequisite_map(Module, [module.pk for module in modules])
+    
+    # (enrollment id, module id) pairs with at least one completed lesson
+    completed = set()
+    required = set().union(*prerequisites.values())
+    enrollments = {enrollment_map[course_id] for course_id in course_ids} - {None}
+    if required and enrollments:
+        completed = set(LessonProgress.objects.filter(
+            enrollment__in=enrollments,
+            lesson__module_id__in=required,
+            status='completed'
+        ).values_list('enrollment_id', 'lesson__module_id').distinct())
+    
+    for module in modules:
+        enrollment = enrollment_map[module.course_id]
+        if instructors.get(module.course_id) == user.pk:
+            module_access[module.pk] = True
+        elif enrollment is None:
+            module_access[module.pk] = False
+        else:
+            module_access[module.pk] = all(
+                (enrollment.pk, prerequisite_id) in completed
+                for prerequisite_id in prerequisites.get(module.pk, ())
+            )
+    return module_access
+
+
+class ModuleListSerializer(serializers.ListSerializer):
+    """Preloads the requesting user's lesson progress and access for every module in the list"""
+    
+    def to_representation(self, data):
+        modules = list(data.all() if isinstance(data, models.Manager) else data)
+        request = self.context.get('request')
+        if modules and request and request.user.is_authenticated:
+            module_progress = self.context.setdefault('_module_progress', {})
+            pending = [module for module in modules if module.pk not in module_progress]
+            if pending:
+                self._preload_progress(pending, request.user, module_progress)
+            
+            _preload_module_access(self.context, request.user, modules)
+        return super().to_representation(modules)
+    
+    def _preload_progress(self, modules, user, module_progress):
+        enrollment_map = _preload_enrollments(
+            self.context, user, {module.course_id for module in modules}
+        )
+        enrolled = [module for module in modules if enrollment_map[module.course_id]]
+        module_progress.update((module.pk, None) for module in modules)
+        if not enrolled:
+            return
+        
+        module_ids = [module.pk for module in enrolled]
+        completed = dict(LessonProgress.objects.filter(
+            enrollment__in={enrollment_map[module.course_id] for module in enrolled},
+            lesson__module_id__in=module_ids,
+            status='completed'
+        ).values_list('lesson__module_id').annotate(Count('id')))
+        
+        totals = {}
+        for module in enrolled:
+            if hasattr(module, '_lessons'):
+                totals[module.pk] = len(module._lessons)
+            elif hasattr(module, 'lessons_count'):
+                totals[module.pk] = module.lessons_count
+        uncounted = [pk for pk in module_ids if pk not in totals]
+        if uncounted:
+            totals.update(Lesson.objects.filter(
+                module_id__in=uncounted
+            ).values_list('module_id').annotate(Count('id')))
+        
+        for pk in module_ids:
+            module_progress[pk] = (completed.get(pk, 0), totals.get(pk, 0))
+
+
+class ModuleSerializer(CachedFieldsMixin, ContextCachedSerializer):
     lessons_count = serializers.SerializerMethodField()
     user_progress = serializers.SerializerMethodField()
     is_accessible = serializers.SerializerMethodField()
@@ -171,63 +486,51 @@ class ModuleSerializer(serializers.ModelSerializer):
             'is_accessible', 'created_at'
         ]
         read_only_fields = ['id', 'created_at']
+        list_serializer_class = ModuleListSerializer
     
     def get_lessons_count(self, obj):
+        # Modules from DetailedCourseSerializer.get_modules carry their lessons
+        if hasattr(obj, '_lessons'):
+            return len(obj._lessons)
+        if hasattr(obj, 'lessons_count'):
+            return obj.lessons_count
         return obj.lessons.count()
     
     def get_user_progress(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            try:
-                enrollment = obj.course.enrollments.get(student=request.user)
-                total_lessons = obj.lessons.count()
-                completed_lessons = LessonProgress.objects.filter(
-                    enrollment=enrollment,
-                    lesson__module=obj,
-                    status='completed'
-                ).count()
-                
-                if total_lessons > 0:
-                    progress = (completed_lessons / total_lessons) * 100
-                else:
-                    progress = 0
-                
-                return {
-                    'completed_lessons': completed_lessons,
-                    'total_lessons': total_lessons,
-                    'progress_percentage': round(progress, 2)
-                }
-            except CourseEnrollment.DoesNotExist:
-                pass
-        return None
-    
-    def get_is_accessible(self, obj):
-        request = self.context.get('request')
-        if not request or not request.user.is_authenticated:
-            return False
-        
-        user = request.user
+        module_progress = self.context.get('_module_progress', {})
+        if obj.pk in module_progress:
+            counts = module_progress[obj.pk]
+            return self._progress(*counts) if counts else None
         
-        # Instructors can access all modules
-        if obj.course.instructor == user:
-            return True
+        if not self._is_auth:
+            return None
+        enrollment = _preload_enrollments(self.context, self._user, [obj.course_id])[obj.course_id]
+        if enrollment is None:
+            return None
+        completed_lessons = LessonProgress.objects.filter(
+            enrollment=enrollment,
+            lesson__module=obj,
+            status='completed'
+        ).count()
+        return self._progress(completed_lessons, self.get_lessons_count(obj))
+    
+    @staticmethod
+    def _progress(completed_lessons, total_lessons):
+        if total_lessons > 0:
+            progress = (completed_lessons / total_lessons) * 100
+        else:
+            progress = 0
         
-        # Check if user is enrolled
-        if not obj.course.enrollments.filter(student=user).exists():
+        return {
+            'completed_lessons': completed_lessons,
+            'total_lessons': total_lessons,
+            'progress_percentage': round(progress, 2)
+        }
+    
+    def get_is_accessible(self, obj):
+        if not self._is_auth:
             return False
-        
-        # Check prerequisites
-        if obj.prerequisites.exists():
-            enrollment = obj.course.enrollments.get(student=user)
-            completed_prerequisites = LessonProgress.objects.filter(
-                enrollment=enrollment,
-                lesson__module__in=obj.prerequisites.all(),
-                status='completed'
-            ).values('lesson__module').distinct().count()
-            
-            return completed_prerequisites == obj.prerequisites.count()
-        
-        return True
+        return _preload_module_access(self.context, self._user, [obj])[obj.pk]
 
 
 class DetailedModuleSerializer(ModuleSerializer):
@@ -244,7 +547,96 @@ class DetailedModuleSerializer(ModuleSerializer):
 
 
 # Lesson Serializers
-class LessonSerializer(serializers.ModelSerializer):
+def _preload_lesson_access(context, user, lessons):
+    """Map lesson id -> whether the user can open it, cached in the serializer context"""
+    lesson_access = context.setdefault('_lesson_access', {})
+    lessons = [lesson for lesson in lessons if lesson.pk not in lesson_access]
+    if not lessons:
+        return lesson_access
+    
+    course_ids = {lesson.module.course_id for lesson in lessons}
+    instructors = _course_instructors(context, course_ids)
+    enrollment_map = _preload_enrollments(context, user, course_ids)
+    prerequisites = _prerequisite_map(Lesson, [lesson.pk for lesson in lessons])
+    
+    completed = set()
+    required = set().union(*prerequisites.values())
+    enrollments = {enrollment_map[course_id] for course_id in course_ids} - {None}
+    if required and enrollments:
+        completed = set(LessonProgress.objects.filter(
+            enrollment__in=enrollments,
+            lesson_id__in=required,
+            status='completed'
+        ).values_list('enrollment_id', 'lesson_id'))
+    
+    for lesson in lessons:
+        course_id = lesson.module.course_id
+        enrollment = enrollment_map[course_id]
+        if lesson.is_preview or instructors.get(course_id) == user.pk:
+            lesson_access[lesson.pk] = True
+        elif enrollment is None:
+            lesson_access[lesson.pk] = False
+        else:
+            lesson_access[lesson.pk] = all(
+                (enrollment.pk, prerequisite_id) in completed
+                for prerequisite_id in prerequisites.get(lesson.pk, ())
+            )
+    return lesson_access
+
+
+def _preload_lesson_progress(context, user, lessons):
+    """Map lesson id -> the user's progress on it (or None), cached in the serializer context"""
+    progress_map = context.setdefault('_lesson_progress', {})
+    lessons = [lesson for lesson in lessons if lesson.pk not in progress_map]
+    if not lessons:
+        return progress_map
+    
+    course_ids = {lesson.module.course_id for lesson in lessons}
+    enrollment_map = _preload_enrollments(context, user, course_ids)
+    enrollments = {enrollment_map[course_id] for course_id in course_ids} - {None}
+    progress_map.update((lesson.pk, None) for lesson in lessons)
+    if enrollments:
+        # A user has one enrollment per course, so (enrollment, lesson) pairs can't cross
+        for progress in LessonProgress.objects.filter(
+            enrollment__in=enrollments, lesson_id__in=[lesson.pk for lesson in lessons]
+        ).only(
+            'lesson_id', 'status', 'progress_percentage', 'time_spent', 'bookmarked',
+            'last_accessed'
+        ):
+            progress_map[progress.lesson_id] = progress
+    return progress_map
+
+
+def _annotate_exercise_counts(lessons):
+    """Set ``exercises_count`` on lessons loaded without the annotation, in one grouped query"""
+    missing = {lesson.pk: lesson for lesson in lessons if not hasattr(lesson, 'exercises_count')}
+    if missing:
+        counts = dict(Exercise.objects.filter(
+            lesson_id__in=missing
+        ).order_by().values_list('lesson_id').annotate(count=Count('id')))
+        for lesson_id, lesson in missing.items():
+            lesson.exercises_count = counts.get(lesson_id, 0)
+
+
+def _preload_lessons(context, lessons):
+    """Load what LessonSerializer's method fields read, for every lesson at once"""
+    _annotate_exercise_counts(lessons)
+    request = context.get('request')
+    if lessons and request and request.user.is_authenticated:
+        _preload_lesson_access(context, request.user, lessons)
+        _preload_lesson_progress(context, request.user, lessons)
+
+
+class LessonListSerializer(serializers.ListSerializer):
+    """Preloads the requesting user's access and progress for every lesson in the list"""
+    
+    def to_representation(self, data):
+        lessons = list(data.all() if isinstance(data, models.Manager) else data)
+        _preload_lessons(self.context, lessons)
+        return super().to_representation(lessons)
+
+
+class LessonSerializer(CachedFieldsMixin, ContextCachedSerializer):
     module = serializers.StringRelatedField(read_only=True)
     exercises_count = serializers.SerializerMethodField()
     user_progress = serializers.SerializerMethodField()
@@ -261,72 +653,35 @@ class LessonSerializer(serializers.ModelSerializer):
             'is_accessible', 'created_at'
         ]
         read_only_fields = ['id', 'slug', 'created_at']
+        list_serializer_class = LessonListSerializer
     
     def get_exercises_count(self, obj):
+        if hasattr(obj, 'exercises_count'):
+            return obj.exercises_count
         return obj.exercises.count()
     
     def get_duration_formatted(self, obj):
-        if obj.estimated_duration:
-            total_seconds = int(obj.estimated_duration.total_seconds())
-            hours = total_seconds // 3600
-            minutes = (total_seconds % 3600) // 60
-            if hours > 0:
-                return f"{hours}h {minutes}m"
-            return f"{minutes}m"
-        return "N/A"
+        return _fmt_duration(obj.estimated_duration_seconds)
     
     def get_user_progress(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            try:
-                enrollment = obj.module.course.enrollments.get(student=request.user)
-                progress = LessonProgress.objects.filter(
-                    enrollment=enrollment,
-                    lesson=obj
-                ).first()
-                
-                if progress:
-                    return {
-                        'status': progress.status,
-                        'progress_percentage': progress.progress_percentage,
-                        'time_spent': str(progress.time_spent),
-                        'bookmarked': progress.bookmarked,
-                        'last_accessed': progress.last_accessed
-                    }
-            except CourseEnrollment.DoesNotExist:
-                pass
+        if not self._is_auth:
+            return None
+        progress = _preload_lesson_progress(self.context, self._user, [obj])[obj.pk]
+        if progress:
+            return {
+                'status': progress.status,
+                'progress_percentage': progress.progress_percentage,
+                'time_spent': str(progress.time_spent),
+                'bookmarked': progress.bookmarked,
+                'last_accessed': progress.last_accessed
+            }
         return None
     
     def get_is_accessible(self, obj):
-        request = self.context.get('request')
-        if not request:
+        # Anonymous viewers (or no request at all) only get preview lessons
+        if not self._is_auth:
             return obj.is_preview
-        
-        user = request.user
-        
-        # Always accessible for instructors and preview lessons
-        if obj.module.course.instructor == user or obj.is_preview:
-            return True
-        
-        if not user.is_authenticated:
-            return False
-        
-        # Check if user is enrolled
-        if not obj.module.course.enrollments.filter(student=user).exists():
-            return False
-        
-        # Check prerequisites
-        if obj.prerequisites.exists():
-            enrollment = obj.module.course.enrollments.get(student=user)
-            completed_prerequisites = LessonProgress.objects.filter(
-                enrollment=enrollment,
-                lesson__in=obj.prerequisites.all(),
-                status='completed'
-            ).count()
-            
-            return completed_prerequisites == obj.prerequisites.count()
-        
-        return True
+        return _preload_lesson_access(self.context, self._user, [obj])[obj.pk]
 
 
 class DetailedLessonSerializer(LessonSerializer):
@@ -348,43 +703,67 @@ class DetailedLessonSerializer(LessonSerializer):
         exercises = obj.exercises.order_by('order')
         return ExerciseSerializer(exercises, many=True, context=self.context).data
     
+    def _get_siblings(self, obj):
+        """(previous, next) lesson summaries, loaded once per module"""
+        siblings = self.context.setdefault('_lesson_siblings', {})
+        if obj.pk not in siblings:
+            # (module, order) is unique, so neighbours are adjacent rows
+            lessons = list(Lesson.objects.filter(
+                module_id=obj.module_id
+            ).order_by('order').values('id', 'title', 'slug'))
+            for index, lesson in enumerate(lessons):
+                siblings[lesson['id']] = (
+                    lessons[index - 1] if index > 0 else None,
+                    lessons[index + 1] if index + 1 < len(lessons) else None
+                )
+        return siblings.get(obj.pk, (None, None))
+    
     def get_next_lesson(self, obj):
-        try:
-            next_lesson = Lesson.objects.filter(
-                module=obj.module,
-                order__gt=obj.order
-            ).order_by('order').first()
-            
-            if next_lesson:
-                return {
-                    'id': next_lesson.id,
-                    'title': next_lesson.title,
-                    'slug': next_lesson.slug
-                }
-        except Lesson.DoesNotExist:
-            pass
-        return None
+        return self._get_siblings(obj)[1]
     
     def get_previous_lesson(self, obj):
-        try:
-            prev_lesson = Lesson.objects.filter(
-                module=obj.module,
-                order__lt=obj.order
-            ).order_by('-order').first()
-            
-            if prev_lesson:
-                return {
-                    'id': prev_lesson.id,
-                    'title': prev_lesson.title,
-                    'slug': prev_lesson.slug
-                }
-        except Lesson.DoesNotExist:
-            pass
-        return None
+        return self._get_siblings(obj)[0]
 
 
 # Exercise Serializers
-class ExerciseSerializer(serializers.ModelSerializer):
+def _submission_stats(user, exercise_ids):
+    """Map exercise id -> (submission count, best score, passed) for one student"""
+    stats = dict.fromkeys(exercise_ids, (0, None, False))
+    rows = ExerciseSubmission.objects.filter(
+        student=user, exercise_id__in=exercise_ids
+    ).values('exercise_id').annotate(
+        count=Count('id'),
+        best=Max('score'),
+        passed=Max(Case(When(status='passed', then=1), default=0, output_field=IntegerField()))
+    )
+    for row in rows:
+        stats[row['exercise_id']] = (row['count'], row['best'], bool(row['passed']))
+    return stats
+
+
+def _preload_exercise_stats(context, user, exercise_ids):
+    """Map exercise id -> the user's submission stats, cached in the serializer context"""
+    exercise_stats = context.setdefault('_ex_stats', {})
+    pending = [exercise_id for exercise_id in exercise_ids if exercise_id not in exercise_stats]
+    if pending:
+        exercise_stats.update(_submission_stats(user, pending))
+    return exercise_stats
+
+
+class ExerciseListSerializer(serializers.ListSerializer):
+    """Preloads the requesting user's submission stats for every exercise in the list"""
+    
+    def to_representation(self, data):
+        exercises = list(data.all() if isinstance(data, models.Manager) else data)
+        request = self.context.get('request')
+        if exercises and request and request.user.is_authenticated:
+            _preload_exercise_stats(
+                self.context, request.user, [exercise.pk for exercise in exercises]
+            )
+        return super().to_representation(exercises)
+
+
+class ExerciseSerializer(CachedFieldsMixin, ContextCachedSerializer):
     lesson = serializers.StringRelatedField(read_only=True)
     user_submissions = serializers.SerializerMethodField()
     best_score = serializers.SerializerMethodField()
@@ -400,31 +779,21 @@ class ExerciseSerializer(serializers.ModelSerializer):
             'is_completed', 'created_at'
         ]
         read_only_fields = ['id', 'created_at']
+        list_serializer_class = ExerciseListSerializer
+    
+    def _get_stats(self, obj):
+        if not self._is_auth:
+            return 0, None, False
+        return _preload_exercise_stats(self.context, self._user, [obj.pk])[obj.pk]
     
     def get_user_submissions(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            submissions = obj.submissions.filter(student=request.user).count()
-            return submissions
-        return 0
+        return self._get_stats(obj)[0]
     
     def get_best_score(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            best = obj.submissions.filter(
-                student=request.user
-            ).aggregate(best_score=serializers.Max('score'))['best_score']
-            return best
-        return None
+        return self._get_stats(obj)[1]
     
     def get_is_completed(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.submissions.filter(
-                student=request.user,
-                status='passed'
-            ).exists()
-        return False
+        return self._get_stats(obj)[2]
 
 
 class DetailedExerciseSerializer(ExerciseSerializer):
@@ -441,10 +810,9 @@ class DetailedExerciseSerializer(ExerciseSerializer):
         ]
     
     def get_recent_submissions(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
+        if self._is_auth:
             submissions = obj.submissions.filter(
-                student=request.user
+                student=self._user
             ).order_by('-submitted_at')[:5]
             
             return [{
@@ -474,12 +842,36 @@ class CourseEnrollmentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'enrolled_at', 'last_accessed']
     
     def get_duration_enrolled(self, obj):
-        from django.utils import timezone
-        if obj.completed_at:
-            duration = obj.completed_at - obj.enrolled_at
-        else:
-            duration = timezone.now() - obj.enrolled_at
-        return str(duration.days) + " days"
+        end = obj.completed_at or timezone.now()
+        return f"{(end - obj.enrolled_at).days} days"
+
+
+class CourseStudentSerializer(serializers.ModelSerializer):
+    """One row of a course's student roster, built from an enrollment"""
+    id = serializers.UUIDField(source='student.id', read_only=True)
+    username = serializers.CharField(source='student.username', read_only=True)
+    full_name = serializers.CharField(source='student.get_full_name', read_only=True)
+    email = serializers.EmailField(source='student.email', read_only=True)
+    avatar = serializers.SerializerMethodField()
+    enrollment = CourseEnrollmentSerializer(source='*', read_only=True)
+    
+    class Meta:
+        model = CourseEnrollment
+        fields = ['id', 'username', 'full_name', 'email', 'avatar', 'enrollment']
+    
+    def get_avatar(self, obj):
+        # An empty name means no file, so storage is only asked for URLs that exist
+        avatar = obj.student.avatar
+        return avatar.url if avatar.name else None
+
+
+class LessonProgressListSerializer(FastListSerializer):
+    """Preloads every row's nested lesson fields at once"""
+    
+    def to_representation(self, data):
+        rows = list(data.all() if isinstance(data, models.Manager) else data)
+        _preload_lessons(self.context, [row.lesson for row in rows])
+        return super().to_representation(rows)
 
 
 class LessonProgressSerializer(serializers.ModelSerializer):
@@ -492,6 +884,18 @@ class LessonProgressSerializer(serializers.ModelSerializer):
             'notes', 'bookmarked', 'started_at', 'completed_at', 'last_accessed'
         ]
         read_only_fields = ['id', 'started_at', 'completed_at', 'last_accessed']
+        list_serializer_class = LessonProgressListSerializer
+
+
+class ExerciseSubmissionListSerializer(FastListSerializer):
+    """Preloads the submission stats of every row's nested exercise at once"""
+    
+    def to_representation(self, data):
+        rows = list(data.all() if isinstance(data, models.Manager) else data)
+        request = self.context.get('request')
+        if rows and request and request.user.is_authenticated:
+            _preload_exercise_stats(self.context, request.user, {row.exercise_id for row in rows})
+        return super().to_representation(rows)
 
 
 class ExerciseSubmissionSerializer(serializers.ModelSerializer):
@@ -509,6 +913,12 @@ class ExerciseSubmissionSerializer(serializers.ModelSerializer):
             'attempt_number', 'is_final_submission', 'submitted_at', 'graded_at'
         ]
         read_only_fields = ['id', 'submitted_at', 'graded_at']
+        list_serializer_class = ExerciseSubmissionListSerializer
+
+
+class AttemptLimitReached(serializers.ValidationError):
+    """Raised from save() when a student has used up an exercise's attempts"""
+    default_detail = "Maximum number of attempts reached"
 
 
 class CreateExerciseSubmissionSerializer(serializers.ModelSerializer):
@@ -518,18 +928,39 @@ class CreateExerciseSubmissionSerializer(serializers.ModelSerializer):
         model = ExerciseSubmission
         fields = ['submitted_code', 'is_final_submission']
     
+    def validate_submitted_code(self, value):
+        if not value or value.isspace():
+            raise serializers.ValidationError("Submitted code cannot be empty")
+        return value
+    
     def create(self, validated_data):
         validated_data['student'] = self.context['request'].user
         validated_data['exercise'] = self.context['exercise']
         
-        # Calculate attempt number
-        existing_attempts = ExerciseSubmission.objects.filter(
-            student=validated_data['student'],
-            exercise=validated_data['exercise']
-        ).count()
-        validated_data['attempt_number'] = existing_attempts + 1
-        
-        return super().create(validated_data)
+        with transaction.atomic():
+            # Lock the exercise row so concurrent submits get distinct attempt numbers
+            # and can't slip past the attempt limit together
+            exercise = Exercise.objects.select_for_update().only('id', 'max_attempts').get(
+                pk=validated_data['exercise'].pk
+            )
+            last_attempt = ExerciseSubmission.objects.filter(
+                student=validated_data['student'],
+                exercise=validated_data['exercise']
+            ).aggregate(last=Coalesce(Max('attempt_number'), 0))['last']
+            if exercise.max_attempts and last_attempt >= exercise.max_attempts:
+                raise AttemptLimitReached()
+            validated_data['attempt_number'] = last_attempt + 1
+            
+            return super().create(validated_data)
+
+
+class ImportExerciseSubmissionSerializer(CreateExerciseSubmissionSerializer):
+    """Serializer for one entry of a bulk submission import, made on a student's behalf"""
+    
+    student_id = serializers.UUIDField()
+    
+    class Meta(CreateExerciseSubmissionSerializer.Meta):
+        fields = ['student_id', *CreateExerciseSubmissionSerializer.Meta.fields]
 
 
 # Rating Serializers
@@ -542,6 +973,12 @@ class CourseRatingSerializer(serializers.ModelSerializer):
             'id', 'student', 'rating', 'review', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'student', 'created_at', 'updated_at']
+        list_serializer_class = FastListSerializer
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        # Reviewers are joined in; only haul the columns their cards render
+        return queryset.defer(*_unrendered_user_columns('student'))
 
 
 class CreateCourseRatingSerializer(serializers.ModelSerializer):
@@ -0,0 +1,103 @@
+# courses/signals.py
+"""Cache invalidation for the courses app"""
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from utils.pagination import invalidate_counts
+
+from .models import (
+    Course, CourseCategory, CourseEnrollment, CourseRating, Exercise, ExerciseSubmission, Lesson,
+    LessonProgress, Module
+)
+
+# Key prefix and lifetime of the cached catalog pages (category listings and course search)
+CATALOG_CACHE_PREFIX = 'courses-catalog'
+CATALOG_CACHE_TIMEOUT = 60 * 5
+
+# Shared (not per-user) copy of the category tree
+CATEGORY_TREE_CACHE_KEY = 'courses-category-tree:v1'
+
+
+def invalidate_catalog_cache():
+    """Drop every cached catalog page"""
+    cache.delete(CATEGORY_TREE_CACHE_KEY)
+    delete_pattern = getattr(cache, 'delete_pattern', None)
+    if delete_pattern is not None:
+        delete_pattern(f'views.decorators.cache.*.{CATALOG_CACHE_PREFIX}.*')
+
+
+@receiver([post_save, post_delete], sender=CourseCategory)
+@receiver([post_save, post_delete], sender=Course)
+def catalog_changed(sender, **kwargs):
+    invalidate_catalog_cache()
+
+
+@receiver([post_save, post_delete], sender=Course)
+@receiver([post_save, post_delete], sender=CourseEnrollment)
+@receiver([post_save, post_delete], sender=LessonProgress)
+@receiver([post_save, post_delete], sender=ExerciseSubmission)
+def paginated_list_changed(sender, **kwargs):
+    invalidate_counts(sender)
+
+
+def touch_courses(**lookup):
+    """Bump updated_at so cached course rows (keyed by it) pick up structure changes"""
+    Course.objects.filter(**lookup).update(updated_at=timezone.now())
+
+
+@receiver([post_save, post_delete], sender=Module)
+def module_changed(sender, instance, **kwargs):
+    touch_courses(pk=instance.course_id)
+
+
+@receiver([post_save, post_delete], sender=Lesson)
+def lesson_changed(sender, instance, **kwargs):
+    touch_courses(modules=instance.module_id)
+
+
+@receiver([post_save, post_delete], sender=Exercise)
+def exercise_changed(sender, instance, **kwargs):
+    touch_courses(modules__lessons=instance.lesson_id)
+
+
+@receiver([post_save, post_delete], sender=CourseEnrollment)
+def enrollment_changed(sender, instance, **kwargs):
+    cache.delete(CourseEnrollment.cache_key(instance.student_id, instance.course_id))
+
+
+# Columns whose change moves a rating between (or within) the course totals
+RATING_TOTAL_FIELDS = frozenset({'course', 'course_id', 'rating'})
+
+
+@receiver(pre_save, sender=CourseRating)
+def rating_saving(sender, instance, update_fields=None, **kwargs):
+    """Remember the stored (course_id, rating) so post_save can apply the difference"""
+    if update_fields is not None and not RATING_TOTAL_FIELDS.intersection(update_fields):
+        instance._stored_rating = False
+    elif not hasattr(instance, '_stored_rating'):
+        # Callers that already read the stored row may seed _stored_rating themselves
+        instance._stored_rating = None if instance.pk is None else CourseRating.objects.filter(
+            pk=instance.pk
+        ).values_list('course_id', 'rating').first()
+
+
+@receiver(post_save, sender=CourseRating)
+def rating_saved(sender, instance, **kwargs):
+    stored = instance.__dict__.pop('_stored_rating', None)
+    if stored is False:
+        return
+    if stored is None:
+        Course.adjust_rating_totals(instance.course_id, instance.rating, 1)
+    elif stored[0] == instance.course_id:
+        if instance.rating != stored[1]:
+            Course.adjust_rating_totals(instance.course_id, instance.rating - stored[1], 0)
+    else:
+        Course.adjust_rating_totals(stored[0], -stored[1], -1)
+        Course.adjust_rating_totals(instance.course_id, instance.rating, 1)
+
+
+@receiver(post_delete, sender=CourseRating)
+def rating_deleted(sender, instance, **kwargs):
+    Course.adjust_rating_totals(instance.course_id, -instance.rating, -1)
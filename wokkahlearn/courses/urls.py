@@ -1,235 +1,141 @@
-from django.urls import path, include
-from rest_framework.routers import DefaultRouter
+from django.db import models
+from django.http import JsonResponse
+from django.urls import include, path
+from django.urls.resolvers import URLPattern
+from django.views.decorators.cache import cache_page
+from django.views.decorators.vary import vary_on_headers
+from rest_framework.routers import SimpleRouter
+from utils.db_routers import use_replica
 from . import views
+from .signals import CATALOG_CACHE_PREFIX, CATALOG_CACHE_TIMEOUT
+
+UUID_LOOKUP_REGEX = '[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'
+
+
+class UUIDLookupRouter(SimpleRouter):
+    """SimpleRouter that only matches well-formed UUIDs for UUID primary keys"""
+    
+    def get_lookup_regex(self, viewset, lookup_prefix=''):
+        queryset = getattr(viewset, 'queryset', None)
+        if (
+            getattr(viewset, 'lookup_value_regex', None) is None
+            and getattr(viewset, 'lookup_field', 'pk') == 'pk'
+            and queryset is not None
+            and isinstance(queryset.model._meta.pk, models.UUIDField)
+        ):
+            lookup_url_kwarg = getattr(viewset, 'lookup_url_kwarg', None) or 'pk'
+            return f'(?P<{lookup_prefix}{lookup_url_kwarg}>{UUID_LOOKUP_REGEX})'
+        return super().get_lookup_regex(viewset, lookup_prefix)
+
+
+# Routed viewsets: (prefix, viewset, basename)
+REGISTRY = (
+    ('categories', views.CourseCategoryViewSet, 'course-category'),
+    ('courses', views.CourseViewSet, 'course'),
+    ('modules', views.ModuleViewSet, 'module'),
+    ('lessons', views.LessonViewSet, 'lesson'),
+    ('exercises', views.ExerciseViewSet, 'exercise'),
+    ('enrollments', views.CourseEnrollmentViewSet, 'enrollment'),
+    ('lesson-progress', views.LessonProgressViewSet, 'lesson-progress'),
+    ('exercise-submissions', views.ExerciseSubmissionViewSet, 'exercise-submission'),
+    ('ratings', views.CourseRatingViewSet, 'course-rating'),
+)
 
 # Create a router and register our viewsets
-router = DefaultRouter()
-router.register(r'categories', views.CourseCategoryViewSet, basename='course-category')
-router.register(r'courses', views.CourseViewSet, basename='course')
-router.register(r'modules', views.ModuleViewSet, basename='module')
-router.register(r'lessons', views.LessonViewSet, basename='lesson')
-router.register(r'exercises', views.ExerciseViewSet, basename='exercise')
-router.register(r'enrollments', views.CourseEnrollmentViewSet, basename='enrollment')
-router.register(r'lesson-progress', views.LessonProgressViewSet, basename='lesson-progress')
-router.register(r'exercise-submissions', views.ExerciseSubmissionViewSet, basename='exercise-submission')
-router.register(r'ratings', views.CourseRatingViewSet, basename='course-rating')
-router.register(r'bulk', views.BulkOperationsViewSet, basename='bulk-operations')
-router.register(r'search', views.AdvancedSearchViewSet, basename='advanced-search')
-
-urlpatterns = [
-    path('', include(router.urls)),
+router = UUIDLookupRouter(trailing_slash=True)
+for prefix, viewset, basename in REGISTRY:
+    router.register(prefix, viewset, basename=basename)
+
+# Read-only mirrors of the catalog under ro/, so a proxy in front can cache the whole prefix
+READ_ONLY_METHODS = ['get', 'head', 'options']
+READ_ONLY_PREFIXES = ('categories', 'courses', 'modules', 'lessons', 'exercises')
+
+ro_router = UUIDLookupRouter(trailing_slash=True)
+for prefix, viewset, basename in REGISTRY:
+    if prefix not in READ_ONLY_PREFIXES:
+        continue
+    read_only = type(
+        f'ReadOnly{viewset.__name__}', (viewset,), {'http_method_names': READ_ONLY_METHODS}
+    )
+    ro_router.register(prefix, read_only, basename=f'ro-{basename}')
+
+# Action-only viewsets are routed straight to their actions:
+# (prefix, viewset, basename, http method, action)
+ACTION_ROUTES = (
+    ('bulk', views.BulkOperationsViewSet, 'bulk-operations', 'post', 'bulk_create_modules'),
+    ('bulk', views.BulkOperationsViewSet, 'bulk-operations', 'post', 'bulk_import_lessons'),
+    ('bulk', views.BulkOperationsViewSet, 'bulk-operations', 'post', 'exercises'),
+    ('bulk', views.BulkOperationsViewSet, 'bulk-operations', 'post', 'submissions'),
+    ('bulk', views.BulkOperationsViewSet, 'bulk-operations', 'post', 'messages'),
+    ('search', views.AdvancedSearchViewSet, 'advanced-search', 'get', 'courses'),
+    ('search', views.AdvancedSearchViewSet, 'advanced-search', 'get', 'students'),
+    ('search', views.AdvancedSearchViewSet, 'advanced-search', 'get', 'submissions'),
+)
+
+# Detail URL templates keyed by basename, for links built without reverse()
+URL_TEMPLATES = {
+    basename: f'/api/courses/{prefix}/{{pk}}/'
+    for prefix, viewset, basename in router.registry
+}
+
+# API index, built once from the registry instead of reverse()-ing every route per hit
+API_ROOT = {prefix: f'/api/courses/{prefix}/' for prefix, viewset, basename in REGISTRY}
+
+
+def api_root(request):
+    return JsonResponse(API_ROOT)
+
+
+# Read-mostly catalog routes served from the page cache; see courses.signals for invalidation
+CACHED_ROUTES = {
+    'course-category-list',
+    'course-category-courses',
+    'course-category-tree',
+    'advanced-search-courses',
+}
+
+
+# Heaviest read-only lists, served from the read replica when one is configured
+REPLICA_ROUTES = {
+    'lesson-progress-list',
+    'exercise-submission-list',
+}
+
+
+def _cache_route(pattern):
+    callback = vary_on_headers('Accept', 'Authorization', 'Cookie', 'Accept-Language')(
+        cache_page(CATALOG_CACHE_TIMEOUT, key_prefix=CATALOG_CACHE_PREFIX)(pattern.callback)
+    )
+    return URLPattern(pattern.pattern, callback, pattern.default_args, pattern.name)
+
+
+def _replica_route(pattern):
+    return URLPattern(
+        pattern.pattern, use_replica(pattern.callback), pattern.default_args, pattern.name
+    )
+
+
+def _action_route(prefix, viewset, basename, method, action):
+    callback = viewset.as_view({method: action}, basename=basename, detail=False)
+    return path(f'{prefix}/{action}/', callback, name=f"{basename}-{action.replace('_', '-')}")
+
+
+# Router.urls builds a fresh pattern list on each access, so compute it once
+_ROUTER_URLS = []
+for pattern in [*router.urls, *(_action_route(*route) for route in ACTION_ROUTES)]:
+    if pattern.name in CACHED_ROUTES:
+        pattern = _cache_route(pattern)
+    elif pattern.name in REPLICA_ROUTES:
+        pattern = _replica_route(pattern)
+    _ROUTER_URLS.append(pattern)
+
+# Writes never reach ro/, so its patterns go last and stay off the hot resolve path
+_RO_URLS = [
+    path('ro/', include(ro_router.urls)),
+    path('', api_root, name='api-root'),
 ]
 
-"""
-COMPLETE ENDPOINT MAPPING FOR COURSES APP:
-
-========================================================================
-COURSE CATEGORIES
-========================================================================
-GET     /api/courses/categories/                    - List all categories
-POST    /api/courses/categories/                    - Create category (admin/instructor)
-GET     /api/courses/categories/{id}/               - Get category details
-PUT     /api/courses/categories/{id}/               - Update category (admin/instructor)
-PATCH   /api/courses/categories/{id}/               - Partial update category (admin/instructor)
-DELETE  /api/courses/categories/{id}/               - Delete category (admin/instructor)
-GET     /api/courses/categories/{id}/courses/       - Get courses in category
-GET     /api/courses/categories/tree/               - Get category tree structure
-
-========================================================================
-COURSES
-========================================================================
-GET     /api/courses/courses/                       - List all published courses
-POST    /api/courses/courses/                       - Create course (instructor)
-GET     /api/courses/courses/{id}/                  - Get course details
-PUT     /api/courses/courses/{id}/                  - Update course (instructor)
-PATCH   /api/courses/courses/{id}/                  - Partial update course (instructor)
-DELETE  /api/courses/courses/{id}/                  - Delete course (instructor)
-
-# Course Actions
-POST    /api/courses/courses/{id}/enroll/           - Enroll in course
-DELETE  /api/courses/courses/{id}/unenroll/         - Unenroll from course
-POST    /api/courses/courses/{id}/rate/             - Rate and review course
-GET     /api/courses/courses/my_courses/            - Get user's enrolled courses
-GET     /api/courses/courses/teaching/              - Get instructor's courses
-GET     /api/courses/courses/{id}/reviews/          - Get course reviews
-
-# Analytics & Reporting
-GET     /api/courses/courses/{id}/analytics/        - Get course analytics
-GET     /api/courses/courses/{id}/engagement/       - Get engagement metrics
-GET     /api/courses/courses/{id}/performance/      - Get performance insights
-GET     /api/courses/courses/{id}/export/           - Export analytics report
-
-# Course Management
-GET     /api/courses/courses/{id}/students/         - Get enrolled students (instructor)
-POST    /api/courses/courses/{id}/publish/          - Publish course (instructor)
-POST    /api/courses/courses/{id}/unpublish/        - Unpublish course (instructor)
-GET     /api/courses/courses/{id}/structure/        - Get complete course structure
-
-========================================================================
-MODULES
-========================================================================
-GET     /api/courses/modules/                       - List modules (filtered by access)
-POST    /api/courses/modules/                       - Create module (instructor)
-GET     /api/courses/modules/{id}/                  - Get module details
-PUT     /api/courses/modules/{id}/                  - Update module (instructor)
-PATCH   /api/courses/modules/{id}/                  - Partial update module (instructor)
-DELETE  /api/courses/modules/{id}/                  - Delete module (instructor)
-GET     /api/courses/modules/{id}/lessons/          - Get lessons in module
-
-========================================================================
-LESSONS
-========================================================================
-GET     /api/courses/lessons/                       - List lessons (filtered by access)
-POST    /api/courses/lessons/                       - Create lesson (instructor)
-GET     /api/courses/lessons/{id}/                  - Get lesson details
-PUT     /api/courses/lessons/{id}/                  - Update lesson (instructor)
-PATCH   /api/courses/lessons/{id}/                  - Partial update lesson (instructor)
-DELETE  /api/courses/lessons/{id}/                  - Delete lesson (instructor)
-
-# Lesson Actions
-POST    /api/courses/lessons/{id}/mark_completed/   - Mark lesson as completed
-POST    /api/courses/lessons/{id}/bookmark/         - Toggle lesson bookmark
-GET     /api/courses/lessons/{id}/exercises/        - Get exercises in lesson
-
-========================================================================
-EXERCISES
-========================================================================
-GET     /api/courses/exercises/                     - List exercises (filtered by access)
-POST    /api/courses/exercises/                     - Create exercise (instructor)
-GET     /api/courses/exercises/{id}/                - Get exercise details
-PUT     /api/courses/exercises/{id}/                - Update exercise (instructor)
-PATCH   /api/courses/exercises/{id}/                - Partial update exercise (instructor)
-DELETE  /api/courses/exercises/{id}/                - Delete exercise (instructor)
-
-# Exercise Actions
-POST    /api/courses/exercises/{id}/submit/         - Submit exercise solution
-GET     /api/courses/exercises/{id}/submissions/    - Get user's submissions
-POST    /api/courses/exercises/{id}/get_hint/       - Get AI-powered hint
-POST    /api/courses/exercises/{id}/provide_feedback/ - Provide instructor feedback
-
-========================================================================
-ENROLLMENTS
-========================================================================
-GET     /api/courses/enrollments/                   - List user's enrollments
-GET     /api/courses/enrollments/{id}/              - Get enrollment details
-GET     /api/courses/enrollments/{id}/progress_detail/ - Get detailed progress
-
-========================================================================
-LESSON PROGRESS
-========================================================================
-GET     /api/courses/lesson-progress/               - List lesson progress
-POST    /api/courses/lesson-progress/               - Create progress entry
-GET     /api/courses/lesson-progress/{id}/          - Get progress details
-PUT     /api/courses/lesson-progress/{id}/          - Update progress
-PATCH   /api/courses/lesson-progress/{id}/          - Partial update progress
-DELETE  /api/courses/lesson-progress/{id}/          - Delete progress
-
-========================================================================
-EXERCISE SUBMISSIONS
-========================================================================
-GET     /api/courses/exercise-submissions/          - List submissions (filtered)
-GET     /api/courses/exercise-submissions/{id}/     - Get submission details
-POST    /api/courses/exercise-submissions/{id}/provide_feedback/ - Provide feedback
-
-========================================================================
-COURSE RATINGS & REVIEWS
-========================================================================
-GET     /api/courses/ratings/                       - List ratings (filtered)
-POST    /api/courses/ratings/                       - Create rating/review
-GET     /api/courses/ratings/{id}/                  - Get rating details
-PUT     /api/courses/ratings/{id}/                  - Update rating (owner only)
-PATCH   /api/courses/ratings/{id}/                  - Partial update rating (owner only)
-DELETE  /api/courses/ratings/{id}/                  - Delete rating (owner only)
-POST    /api/courses/ratings/{id}/reply/            - Reply to review (instructor)
-
-========================================================================
-BULK OPERATIONS
-========================================================================
-POST    /api/courses/bulk/bulk_create_modules/      - Bulk create modules
-POST    /api/courses/bulk/bulk_import_lessons/      - Bulk import lessons
-
-========================================================================
-ADVANCED SEARCH
-========================================================================
-GET     /api/courses/search/courses/                - Advanced course search
-
-========================================================================
-CUSTOM FILTERS AVAILABLE:
-========================================================================
-
-Courses:
-- programming_languages (JSONField contains)
-- skills_gained (JSONField contains)
-- tags (JSONField contains)
-- min_duration, max_duration (duration range)
-- min_rating (rating threshold)
-- min_enrollments (enrollment threshold)
-- max_price (price range)
-- created_after, created_before (date range)
-- instructor_username (instructor search)
-
-Lessons:
-- module_course (filter by course ID)
-- duration_min, duration_max (duration range)
-- lesson_type (video, text, interactive, etc.)
-- is_required, is_preview (boolean filters)
-
-Exercises:
-- lesson_module (filter by module ID)
-- lesson_course (filter by course ID)
-- points_min, points_max (points range)
-- programming_language (exact match)
-- difficulty (easy, medium, hard, expert)
-- ai_hints_enabled, allow_collaboration (boolean filters)
-
-Enrollments:
-- course (filter by course)
-- status (enrolled, completed, dropped, suspended)
-- enrollment_source (direct, invitation, bulk, api, admin)
-
-Exercise Submissions:
-- exercise (filter by exercise)
-- status (submitted, passed, failed, partial, error)
-- auto_graded (boolean filter)
-- is_final_submission (boolean filter)
-
-========================================================================
-WEBSOCKET ENDPOINTS (for real-time features):
-========================================================================
-ws://localhost:8000/ws/courses/{course_id}/          - Course real-time updates
-ws://localhost:8000/ws/lessons/{lesson_id}/          - Lesson real-time updates
-ws://localhost:8000/ws/exercises/{exercise_id}/      - Exercise real-time updates
-
-========================================================================
-FRONTEND COMPONENT MAPPING:
-========================================================================
-
-InstructorDashboard        -> GET /courses/teaching/
-                          -> GET /courses/{id}/analytics/
-
-CourseCreatorForm         -> POST /courses/
-                          -> PUT /courses/{id}/
-                          -> GET /categories/
-
-LiveLessonManager         -> GET /courses/{id}/structure/
-                          -> POST /modules/
-                          -> PUT /modules/{id}/
-                          -> POST /lessons/
-                          -> PUT /lessons/{id}/
-
-ExerciseCreator           -> POST /exercises/
-                          -> PUT /exercises/{id}/
-                          -> GET /exercises/{id}/
-
-StudentProgressTracker    -> GET /courses/{id}/students/
-                          -> GET /enrollments/{id}/progress_detail/
-                          -> GET /exercise-submissions/
-                          -> POST /exercise-submissions/{id}/provide_feedback/
-
-CourseAnalyticsDashboard  -> GET /courses/{id}/analytics/
-                          -> GET /courses/{id}/engagement/
-                          -> GET /courses/{id}/performance/
-                          -> GET /courses/{id}/export/
-
-All frontend API examples are fully supported by these endpoints!
-"""
\ No newline at end of file
+# Mounted directly rather than through include(), so resolving skips a resolver level
+urlpatterns = _ROUTER_URLS + _RO_URLS
+
+# Endpoint reference: docs/api/courses_endpoints.md
@@ -3,60 +3,129 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Avg, Count, Max, Sum, F
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q, Avg, Count, Max, Sum, F, Exists, OuterRef
+from django.contrib.postgres.search import SearchQuery
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from datetime import timedelta
 from django.utils import timezone
-from django.db import models, transaction
+from django.db import connection, models, transaction
 from django.contrib.auth import get_user_model
 import django_filters
 import logging
 
+from accounts.models import UserProfile
+from utils.pagination import CachedCountPagination, invalidate_counts
+from utils.prefetch import AutoPrefetchViewSetMixin, autoprefetch
+from utils.renderers import stream_csv, stream_json_array
+
 from .models import (
     CourseCategory, Course, Module, Lesson, Exercise, 
     CourseEnrollment, LessonProgress, ExerciseSubmission, CourseRating
 )
+from .permissions import IsCourseInstructorOrStaff
 from .serializers import (
     CourseCategorySerializer, CourseSerializer, DetailedCourseSerializer,
     CreateCourseSerializer, ModuleSerializer, DetailedModuleSerializer, 
     LessonSerializer, DetailedLessonSerializer, ExerciseSerializer, 
-    DetailedExerciseSerializer, CourseEnrollmentSerializer, 
+    DetailedExerciseSerializer, CourseEnrollmentSerializer, CourseStudentSerializer,
     LessonProgressSerializer, ExerciseSubmissionSerializer, 
-    CreateExerciseSubmissionSerializer, CourseRatingSerializer,
-    CreateCourseRatingSerializer
+    CreateExerciseSubmissionSerializer, ImportExerciseSubmissionSerializer,
+    CourseRatingSerializer, CreateCourseRatingSerializer, AttemptLimitReached
 )
+from .signals import CATALOG_CACHE_TIMEOUT, CATEGORY_TREE_CACHE_KEY
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+# Rows per INSERT when importing submissions in bulk
+SUBMISSION_BATCH_SIZE = 500
+
+# Course actions only the course's instructor (or staff) may use
+INSTRUCTOR_ACTIONS = frozenset({
+    'analytics', 'engagement', 'performance', 'export', 'students', 'publish', 'unpublish'
+})
+
+# Rows fetched per round trip when streaming exports
+EXPORT_CHUNK_SIZE = 500
+
+# Enrollment columns in a course's analytics export; student identity is opt-in
+ENROLLMENT_EXPORT_FIELDS = (
+    'status', 'progress_percentage', 'lessons_completed', 'exercises_completed',
+    'total_study_time', 'enrolled_at', 'completed_at'
+)
+STUDENT_EXPORT_FIELDS = ('student__username', 'student__email')
+
+# Large columns list serializers never render
+COURSE_LIST_DEFERRED = ('required_skills', 'search_vector')
+LESSON_LIST_DEFERRED = ('content', 'additional_resources')
+EXERCISE_LIST_DEFERRED = (
+    'starter_code', 'solution_code', 'execution_config', 'test_case_data', 'validation_code'
+)
+
+# Columns of each node in the category tree, as CourseCategorySerializer renders them
+CATEGORY_TREE_FIELDS = (
+    'id', 'name', 'slug', 'description', 'icon', 'color',
+    'parent', 'order', 'is_active', 'course_count', 'created_at', 'updated_at'
+)
+
+
+def enrolled_course_ids(user):
+    """Subquery of the course ids ``user`` is enrolled in, for semi-join access filters"""
+    return CourseEnrollment.objects.filter(student=user).values('course_id')
+
+
+def lock_course(course_id):
+    """Lock the course row so concurrent rating writes fold into its totals one at a time"""
+    Course.objects.select_for_update().filter(pk=course_id).values_list('pk').get()
+
+
+def paginated_response(view, queryset, serializer_class):
+    """Serialize ``queryset`` a page at a time when the view paginates"""
+    page = view.paginate_queryset(queryset)
+    rows = queryset if page is None else page
+    data = serializer_class(rows, many=True, context={'request': view.request}).data
+    return Response(data) if page is None else view.get_paginated_response(data)
+
 
 # =============================================================================
 # CUSTOM FILTERS
 # =============================================================================
 
+class CourseSearchFilter(SearchFilter):
+    """SearchFilter that probes Course.search_vector's GIN index on PostgreSQL"""
+    
+    def filter_queryset(self, request, queryset, view):
+        if connection.vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return queryset.filter(search_vector=SearchQuery(' '.join(terms), config='english'))
+
+
 class CourseFilter(django_filters.FilterSet):
     """Custom filter for Course model with advanced filtering"""
     
     # Handle JSONField filtering for programming_languages
     programming_languages = django_filters.CharFilter(
-        field_name='programming_languages',
-        lookup_expr='icontains',
+        method='filter_json_list',
         help_text="Filter by programming language (e.g., 'python', 'javascript')"
     )
     
     # Skills filtering
     skills_gained = django_filters.CharFilter(
-        field_name='skills_gained',
-        lookup_expr='icontains',
+        method='filter_json_list',
         help_text="Filter by skills gained"
     )
     
     # Tags filtering
     tags = django_filters.CharFilter(
-        field_name='tags',
-        lookup_expr='icontains',
+        method='filter_json_list',
         help_text="Filter by tags"
     )
     
@@ -98,6 +167,16 @@ class CourseFilter(django_filters.FilterSet):
         lookup_expr='lte'
     )
     
+    def filter_json_list(self, queryset, name, value):
+        # jsonb containment (@>) is served by the column's GIN index on PostgreSQL; other
+        # backends can't do containment on JSON, so they keep the text match
+        if connection.vendor != 'postgresql':
+            return queryset.filter(**{f'{name}__icontains': value})
+        return queryset.filter(
+            Q(**{f'{name}__contains': [value]}) |
+            Q(**{f'{name}__contains': [value.lower()]})
+        )
+    
     class Meta:
         model = Course
         fields = {
@@ -162,7 +241,7 @@ class LessonFilter(django_filters.FilterSet):
 # VIEWSETS
 # =============================================================================
 
-class CourseCategoryViewSet(viewsets.ModelViewSet):
+class CourseCategoryViewSet(AutoPrefetchViewSetMixin, viewsets.ModelViewSet):
     """API endpoints for course categories"""
     queryset = CourseCategory.objects.filter(is_active=True)
     serializer_class = CourseCategorySerializer
@@ -181,17 +260,23 @@ class CourseCategoryViewSet(viewsets.ModelViewSet):
             permission_classes = [AllowAny]
         return [permission() for permission in permission_classes]
     
+    def get_queryset(self):
+        """Active categories with their published course counts"""
+        return CourseCategory.objects.filter(is_active=True).annotate(
+            course_count=Count('course', filter=Q(course__status='published'))
+        )
+    
     def perform_create(self, serializer):
         """Check permissions for category creation"""
         user = self.request.user
-        if not (user.is_staff or (hasattr(user, 'can_teach') and user.can_teach)):
+        if not (user.is_staff or getattr(user, 'can_teach', False)):
             raise permissions.PermissionDenied("Only admins and instructors can create categories")
         serializer.save()
     
     def perform_update(self, serializer):
         """Check permissions for category updates"""
         user = self.request.user
-        if not (user.is_staff or (hasattr(user, 'can_teach') and user.can_teach)):
+        if not (user.is_staff or getattr(user, 'can_teach', False)):
             raise permissions.PermissionDenied("Only admins and instructors can update categories")
         serializer.save()
     
@@ -203,32 +288,41 @@ class CourseCategoryViewSet(viewsets.ModelViewSet):
             category=category, 
             status='published'
         ).order_by('-created_at')
-        
-        serializer = CourseSerializer(courses, many=True, context={'request': request})
-        return Response(serializer.data)
+        courses = autoprefetch(courses, CourseSerializer)
+        return paginated_response(self, courses, CourseSerializer)
     
     @action(detail=False, methods=['get'])
     def tree(self, request):
         """Get category tree structure"""
-        categories = self.get_queryset().filter(parent=None)
-        data = []
-        
-        for category in categories:
-            serializer = CourseCategorySerializer(
-                category, 
-                context={'request': request, 'include_children': True}
-            )
-            data.append(serializer.data)
-        
-        return Response(data)
+        # The tree is the same for every user, so one cached copy serves them all
+        return Response(cache.get_or_set(
+            CATEGORY_TREE_CACHE_KEY, self._build_tree, CATALOG_CACHE_TIMEOUT
+        ))
+    
+    def _build_tree(self):
+        # One annotated values() query, linked into nested dicts without model or
+        # serializer instances
+        nodes = list(self.get_queryset().order_by('order', 'name').values(*CATEGORY_TREE_FIELDS))
+        by_id = {}
+        for node in nodes:
+            node['children'] = []
+            by_id[node['id']] = node
+        roots = []
+        for node in nodes:
+            if node['parent'] is None:
+                roots.append(node)
+            elif node['parent'] in by_id:
+                by_id[node['parent']]['children'].append(node)
+        return roots
 
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(AutoPrefetchViewSetMixin, viewsets.ModelViewSet):
     """API endpoints for courses"""
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
+    pagination_class = CachedCountPagination
     permission_classes = [AllowAny]  # Public courses viewable by all
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, CourseSearchFilter, OrderingFilter]
     filterset_class = CourseFilter
     search_fields = ['title', 'description', 'tags', 'skills_gained']
     ordering_fields = [
@@ -237,27 +331,39 @@ class CourseViewSet(viewsets.ModelViewSet):
     ]
     ordering = ['-created_at']
     
-    def get_queryset(self):
-        """Filter courses based on user permissions and status"""
+    def _visible_courses(self):
+        """Courses the requesting user may see, before any per-action shaping"""
         user = self.request.user
         
         if user.is_authenticated:
             if user.is_staff:
                 # Admin can see all courses
                 return Course.objects.all()
-            elif hasattr(user, 'can_teach') and user.can_teach:
+            elif getattr(user, 'can_teach', False):
                 # Instructors can see published courses + their own courses
-                return Course.objects.filter(
-                    Q(status='published') | Q(instructor=user)
-                ).distinct()
+                return Course.objects.filter(Q(status='published') | Q(instructor=user))
             else:
                 # Students can see published courses + enrolled courses
                 return Course.objects.filter(
-                    Q(status='published') | Q(enrollments__student=user)
-                ).distinct()
-        else:
-            # Anonymous users can only see published courses
-            return Course.objects.filter(status='published')
+                    Q(status='published') | Q(pk__in=enrolled_course_ids(user))
+                )
+        # Anonymous users can only see published courses
+        return Course.objects.filter(status='published')
+    
+    def get_queryset(self):
+        """Filter courses based on user permissions and status"""
+        user = self.request.user
+        queryset = self._visible_courses()
+        
+        if self.action == 'list':
+            queryset = queryset.defer(*COURSE_LIST_DEFERRED)
+        
+        if user.is_authenticated:
+            queryset = queryset.annotate(is_enrolled=Exists(
+                CourseEnrollment.objects.filter(course=OuterRef('pk'), student=user)
+            ))
+        
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -272,22 +378,38 @@ class CourseViewSet(viewsets.ModelViewSet):
             permission_classes = [IsAuthenticated]
         elif self.action in ['update', 'partial_update', 'destroy']:
             permission_classes = [IsAuthenticated]
+        elif self.action in INSTRUCTOR_ACTIONS:
+            permission_classes = [IsAuthenticated, IsCourseInstructorOrStaff]
         else:
             permission_classes = [AllowAny]
         return [permission() for permission in permission_classes]
     
+    def _get_owned_course(self, *fields):
+        """Fetch the routed course with just ``fields`` for the instructor-only actions
+        
+        The lookup keeps get_queryset()'s visibility filter, so a course the user can't
+        see is a 404 rather than a 403, but skips its enrollment annotation and the
+        serializer joins get_object() would apply.
+        """
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        course = get_object_or_404(
+            self._visible_courses().only('id', 'instructor_id', *fields), pk=self.kwargs[lookup]
+        )
+        self.check_object_permissions(self.request, course)
+        return course
+    
     def perform_create(self, serializer):
         """Check if user can create courses"""
         user = self.request.user
-        if not (user.is_staff or (hasattr(user, 'can_teach') and user.can_teach)):
+        if not (user.is_staff or getattr(user, 'can_teach', False)):
             raise permissions.PermissionDenied("Only instructors can create courses")
         serializer.save(instructor=user)
     
     def perform_update(self, serializer):
         """Check if user can update this course"""
-        course = self.get_object()
+        course = serializer.instance
         user = self.request.user
-        if course.instructor != user and not user.is_staff:
+        if course.instructor_id != user.pk and not user.is_staff:
             raise permissions.PermissionDenied("You can only update your own courses")
         serializer.save()
     
@@ -328,8 +450,7 @@ class CourseViewSet(viewsets.ModelViewSet):
                 )
                 
                 # Update course enrollment count
-                course.total_enrollments = F('total_enrollments') + 1
-                course.save(update_fields=['total_enrollments'])
+                course.adjust_enrollments(1)
                 
                 serializer = CourseEnrollmentSerializer(enrollment, context={'request': request})
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -347,21 +468,19 @@ class CourseViewSet(viewsets.ModelViewSet):
         course = self.get_object()
         user = request.user
         
-        try:
-            enrollment = CourseEnrollment.objects.get(student=user, course=course)
-            enrollment.delete()
+        with transaction.atomic():
+            # Only the request that actually deletes the enrollment decrements the count
+            deleted, _ = CourseEnrollment.objects.filter(student=user, course=course).delete()
+            if not deleted:
+                return Response(
+                    {'error': 'You are not enrolled in this course'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
             # Update course enrollment count
-            course.total_enrollments = F('total_enrollments') - 1
-            course.save(update_fields=['total_enrollments'])
-            
-            return Response({'message': 'Successfully unenrolled from course'})
-            
-        except CourseEnrollment.DoesNotExist:
-            return Response(
-                {'error': 'You are not enrolled in this course'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            course.adjust_enrollments(-1)
+        
+        return Response({'message': 'Successfully unenrolled from course'})
     
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def rate(self, request, pk=None):
@@ -370,7 +489,7 @@ class CourseViewSet(viewsets.ModelViewSet):
         user = request.user
         
         # Check if user is enrolled
-        if not CourseEnrollment.objects.filter(student=user, course=course).exists():
+        if not CourseEnrollment.is_enrolled(user.pk, course.pk):
             return Response(
                 {'error': 'You must be enrolled to rate this course'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -378,19 +497,33 @@ class CourseViewSet(viewsets.ModelViewSet):
         
         serializer = CreateCourseRatingSerializer(data=request.data)
         if serializer.is_valid():
-            # Update or create rating
-            rating, created = CourseRating.objects.update_or_create(
-                student=user,
-                course=course,
-                defaults=serializer.validated_data
-            )
-            
-            # Update course average rating
-            avg_rating = CourseRating.objects.filter(course=course).aggregate(
-                avg=Avg('rating')
-            )['avg']
-            course.average_rating = avg_rating or 0
-            course.save(update_fields=['average_rating'])
+            with transaction.atomic():
+                lock_course(course.pk)
+                previous = CourseRating.objects.filter(
+                    student=user, course=course
+                ).values('id', 'rating', 'review', 'created_at').first()
+                
+                # The lock makes the read above authoritative, so one write either
+                # updates the student's existing rating or inserts it; the rating signals
+                # fold the change into the course totals
+                if previous is None:
+                    rating = CourseRating(student=user, course=course, **serializer.validated_data)
+                    rating._stored_rating = None
+                    rating.save(force_insert=True)
+                else:
+                    # Seed the stored row so fields the request leaves out render as saved
+                    rating = CourseRating(
+                        pk=previous['id'], student=user, course=course,
+                        rating=previous['rating'], review=previous['review'],
+                        created_at=previous['created_at']
+                    )
+                    rating._stored_rating = (course.pk, previous['rating'])
+                    for field, value in serializer.validated_data.items():
+                        setattr(rating, field, value)
+                    rating.save(
+                        force_update=True,
+                        update_fields=[*serializer.validated_data, 'updated_at']
+                    )
             
             response_serializer = CourseRatingSerializer(rating, context={'request': request})
             return Response(response_serializer.data, status=status.HTTP_201_CREATED)
@@ -401,52 +534,59 @@ class CourseViewSet(viewsets.ModelViewSet):
     def my_courses(self, request):
         """Get courses the user is enrolled in"""
         user = request.user
-        enrollments = CourseEnrollment.objects.filter(
-            student=user
-        ).select_related('course').order_by('-enrolled_at')
+        enrollments = autoprefetch(
+            CourseEnrollment.objects.filter(student=user).order_by('-enrolled_at').defer(
+                *(f'course__{name}' for name in COURSE_LIST_DEFERRED)
+            ),
+            CourseEnrollmentSerializer
+        )
+        page = self.paginate_queryset(enrollments)
+        enrollments = list(enrollments if page is None else page)
         
+        # Every listed course is one of these enrollments, so seed the serializers' enrollment map
+        context = {
+            'request': request,
+            '_enrollment_map': {enrollment.course_id: enrollment for enrollment in enrollments},
+        }
+        # The enrollment serializer already nests each course, so every course is rendered once
         courses_data = []
-        for enrollment in enrollments:
-            course_data = CourseSerializer(enrollment.course, context={'request': request}).data
-            course_data['enrollment'] = CourseEnrollmentSerializer(enrollment, context={'request': request}).data
+        enrollments_data = CourseEnrollmentSerializer(enrollments, many=True, context=context).data
+        for enrollment_data in enrollments_data:
+            course_data = dict(enrollment_data['course'])
+            course_data['enrollment'] = enrollment_data
             courses_data.append(course_data)
         
-        return Response(courses_data)
+        return Response(courses_data) if page is None else self.get_paginated_response(courses_data)
     
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def teaching(self, request):
         """Get courses the user is teaching (instructors only)"""
         user = request.user
-        if not (user.is_staff or (hasattr(user, 'can_teach') and user.can_teach)):
+        if not (user.is_staff or getattr(user, 'can_teach', False)):
             return Response(
                 {'error': 'Permission denied'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        courses = Course.objects.filter(instructor=user).order_by('-created_at')
-        serializer = CourseSerializer(courses, many=True, context={'request': request})
-        return Response(serializer.data)
+        courses = autoprefetch(
+            Course.objects.filter(instructor=user).order_by('-created_at'), CourseSerializer
+        )
+        return paginated_response(self, courses, CourseSerializer)
     
     @action(detail=True, methods=['get'])
     def reviews(self, request, pk=None):
         """Get course reviews"""
         course = self.get_object()
-        reviews = CourseRating.objects.filter(course=course).order_by('-created_at')
-        serializer = CourseRatingSerializer(reviews, many=True, context={'request': request})
-        return Response(serializer.data)
+        reviews = autoprefetch(
+            CourseRating.objects.filter(course=course).order_by('-created_at'),
+            CourseRatingSerializer
+        )
+        return paginated_response(self, reviews, CourseRatingSerializer)
     
     @action(detail=True, methods=['get'])
     def analytics(self, request, pk=None):
         """Get course analytics (instructor/admin only)"""
-        course = self.get_object()
-        user = request.user
-        
-        # Check permission - only instructor or admin can view analytics
-        if course.instructor != user and not user.is_staff:
-            return Response(
-                {'error': 'Permission denied'},
-                status=status.HTTP_403_FORBIDDEN
-            )
+        course = self._get_owned_course('average_rating', 'total_reviews')
         
         time_range = request.query_params.get('time_range', '30d')
         detailed = request.query_params.get('detailed', 'false').lower() == 'true'
@@ -462,15 +602,17 @@ class CourseViewSet(viewsets.ModelViewSet):
             else:
                 start_date = timezone.now() - timedelta(days=30)
             
-            # Calculate analytics
-            enrollments = course.enrollments.all()
-            total_enrollments = enrollments.count()
-            active_students = enrollments.filter(
-                last_accessed__gte=timezone.now() - timedelta(days=7)
-            ).count()
+            # Calculate analytics; every enrollment count comes from one aggregate
+            enrollment_stats = course.enrollments.aggregate(
+                total=Count('id'),
+                active=Count('id', filter=Q(last_accessed__gte=timezone.now() - timedelta(days=7))),
+                completed=Count('id', filter=Q(status='completed'))
+            )
+            total_enrollments = enrollment_stats['total']
+            active_students = enrollment_stats['active']
             
             # Calculate completion rates
-            completed_enrollments = enrollments.filter(status='completed').count()
+            completed_enrollments = enrollment_stats['completed']
             completion_rate = (completed_enrollments / total_enrollments * 100) if total_enrollments > 0 else 0
             
             # Exercise statistics
@@ -500,7 +642,7 @@ class CourseViewSet(viewsets.ModelViewSet):
                 'active_students': active_students,
                 'completion_rate': round(completion_rate, 2),
                 'average_rating': course.average_rating,
-                'total_reviews': course.ratings.count(),
+                'total_reviews': course.total_reviews,
                 'total_exercises': total_exercises,
                 'total_submissions': exercise_stats['total_submissions'] or 0,
                 'average_exercise_score': round(exercise_stats['avg_score'] or 0, 2),
@@ -550,14 +692,7 @@ class CourseViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def engagement(self, request, pk=None):
         """Get engagement metrics (instructor/admin only)"""
-        course = self.get_object()
-        user = request.user
-        
-        if course.instructor != user and not user.is_staff:
-            return Response(
-                {'error': 'Permission denied'},
-                status=status.HTTP_403_FORBIDDEN
-            )
+        course = self._get_owned_course()
         
         # Calculate engagement metrics
         enrollments = course.enrollments.all()
@@ -579,23 +714,22 @@ class CourseViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def performance(self, request, pk=None):
         """Get performance insights (instructor/admin only)"""
-        course = self.get_object()
-        user = request.user
-        
-        if course.instructor != user and not user.is_staff:
-            return Response(
-                {'error': 'Permission denied'},
-                status=status.HTTP_403_FORBIDDEN
-            )
+        course = self._get_owned_course()
         
         # Calculate performance metrics
         submissions = ExerciseSubmission.objects.filter(
             exercise__lesson__module__course=course
         )
         
+        stats = submissions.aggregate(
+            avg=Avg('score'),
+            total=Count('id'),
+            passed=Count('id', filter=Q(status='passed'))
+        )
+        
         performance_data = {
-            'average_score': submissions.aggregate(avg=Avg('score'))['avg'] or 0,
-            'pass_rate': submissions.filter(status='passed').count() / submissions.count() * 100 if submissions.count() > 0 else 0,
+            'average_score': stats['avg'] or 0,
+            'pass_rate': stats['passed'] / stats['total'] * 100 if stats['total'] else 0,
             'completion_time_avg': 0,  # TODO: Implement
             'retry_rate': 0,  # TODO: Implement
         }
@@ -605,36 +739,43 @@ class CourseViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def export(self, request, pk=None):
         """Export analytics report (instructor/admin only)"""
-        course = self.get_object()
-        user = request.user
+        course = self._get_owned_course()
+        
+        # ?format= is DRF's renderer override, which 404s on csv; export_format avoids it
+        export_format = request.query_params.get(
+            'export_format', request.query_params.get('format', 'json')
+        ).lower()
+        include_student_data = request.query_params.get('include_student_data', 'false').lower() == 'true'
         
-        if course.instructor != user and not user.is_staff:
+        if export_format not in ('json', 'csv'):
             return Response(
-                {'error': 'Permission denied'},
-                status=status.HTTP_403_FORBIDDEN
+                {'error': 'Unsupported export format'},
+                status=status.HTTP_400_BAD_REQUEST
             )
         
-        export_format = request.query_params.get('format', 'json')
-        include_student_data = request.query_params.get('include_student_data', 'false').lower() == 'true'
+        fields = (STUDENT_EXPORT_FIELDS if include_student_data else ()) + ENROLLMENT_EXPORT_FIELDS
+        columns = [field.split('__')[-1] for field in fields]
+        enrollments = course.enrollments.order_by('enrolled_at')
         
-        # TODO: Implement actual export functionality
-        return Response({
-            'message': 'Export functionality will be implemented',
-            'format': export_format,
-            'include_student_data': include_student_data
-        })
+        # Rows are read in chunks and written as they arrive, so memory stays flat
+        if export_format == 'csv':
+            rows = enrollments.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+            response = StreamingHttpResponse(stream_csv(columns, rows), content_type='text/csv')
+            response['Content-Disposition'] = (
+                f'attachment; filename="course-{course.pk}-analytics.csv"'
+            )
+            return response
+        
+        rows = (
+            dict(zip(columns, row))
+            for row in enrollments.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        return StreamingHttpResponse(stream_json_array(rows), content_type='application/json')
     
     @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
     def students(self, request, pk=None):
         """Get enrolled students (instructor/admin only)"""
-        course = self.get_object()
-        user = request.user
-        
-        if course.instructor != user and not user.is_staff:
-            return Response(
-                {'error': 'Permission denied'},
-                status=status.HTTP_403_FORBIDDEN
-            )
+        course = self._get_owned_course()
         
         enrollments = course.enrollments.select_related('student').order_by('-enrolled_at')
         
@@ -652,39 +793,17 @@ class CourseViewSet(viewsets.ModelViewSet):
                 Q(student__email__icontains=search)
             )
         
-        students_data = []
-        for enrollment in enrollments:
-            student_data = {
-                'id': enrollment.student.id,
-                'username': enrollment.student.username,
-                'full_name': enrollment.student.get_full_name(),
-                'email': enrollment.student.email,
-                'avatar': enrollment.student.avatar.url if hasattr(enrollment.student, 'avatar') and enrollment.student.avatar else None,
-                'enrollment': CourseEnrollmentSerializer(enrollment, context={'request': request}).data
-            }
-            students_data.append(student_data)
-        
-        return Response({
-            'count': len(students_data),
-            'results': students_data
-        })
+        return paginated_response(self, enrollments, CourseStudentSerializer)
     
     @action(detail=True, methods=['post'])
     def publish(self, request, pk=None):
         """Publish course (instructor/admin only)"""
-        course = self.get_object()
-        user = request.user
-        
-        if course.instructor != user and not user.is_staff:
-            return Response(
-                {'error': 'Permission denied'}, 
-                status=status.HTTP_403_FORBIDDEN
-            )
+        course = self._get_owned_course('slug', 'status', 'published_at', 'estimated_duration')
         
         if course.status != 'published':
             course.status = 'published'
             course.published_at = timezone.now()
-            course.save(update_fields=['status', 'published_at'])
+            course.save(update_fields=['status', 'published_at', 'updated_at'])
             
             return Response({'message': 'Course published successfully'})
         
@@ -693,17 +812,10 @@ class CourseViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def unpublish(self, request, pk=None):
         """Unpublish course (instructor/admin only)"""
-        course = self.get_object()
-        user = request.user
-        
-        if course.instructor != user and not user.is_staff:
-            return Response(
-                {'error': 'Permission denied'}, 
-                status=status.HTTP_403_FORBIDDEN
-            )
+        course = self._get_owned_course('slug', 'status', 'estimated_duration')
         
         course.status = 'draft'
-        course.save(update_fields=['status'])
+        course.save(update_fields=['status', 'updated_at'])
         
         return Response({'message': 'Course unpublished successfully'})
     
@@ -717,7 +829,7 @@ class CourseViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ModuleViewSet(viewsets.ModelViewSet):
+class ModuleViewSet(AutoPrefetchViewSetMixin, viewsets.ModelViewSet):
     """API endpoints for course modules"""
     queryset = Module.objects.all()
     serializer_class = ModuleSerializer
@@ -730,11 +842,13 @@ class ModuleViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter modules based on course access"""
         user = self.request.user
-        return Module.objects.filter(
+        queryset = Module.objects.filter(
             Q(course__status='published') |
             Q(course__instructor=user) |
-            Q(course__enrollments__student=user)
-        ).distinct()
+            Q(course_id__in=enrolled_course_ids(user))
+        ).annotate(lessons_count=Count('lessons'))
+        # Ownership checks in the write actions read module.course.instructor
+        return queryset.select_related('course__instructor')
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -750,8 +864,8 @@ class ModuleViewSet(viewsets.ModelViewSet):
     
     def perform_update(self, serializer):
         """Check if user can update this module"""
-        module = self.get_object()
-        if module.course.instructor != self.request.user and not self.request.user.is_staff:
+        module = serializer.instance
+        if module.course.instructor_id != self.request.user.pk and not self.request.user.is_staff:
             raise permissions.PermissionDenied("You can only update modules for your own courses")
         serializer.save()
     
@@ -759,12 +873,16 @@ class ModuleViewSet(viewsets.ModelViewSet):
     def lessons(self, request, pk=None):
         """Get all lessons for this module"""
         module = self.get_object()
-        lessons = module.lessons.order_by('order')
-        serializer = LessonSerializer(lessons, many=True, context={'request': request})
-        return Response(serializer.data)
+        lessons = autoprefetch(
+            module.lessons.annotate(
+                exercises_count=Count('exercises')
+            ).defer(*LESSON_LIST_DEFERRED).order_by('order'),
+            LessonSerializer
+        )
+        return paginated_response(self, lessons, LessonSerializer)
 
 
-class LessonViewSet(viewsets.ModelViewSet):
+class LessonViewSet(AutoPrefetchViewSetMixin, viewsets.ModelViewSet):
     """API endpoints for lessons"""
     queryset = Lesson.objects.all()
     serializer_class = LessonSerializer
@@ -778,11 +896,16 @@ class LessonViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter lessons based on module access"""
         user = self.request.user
-        return Lesson.objects.filter(
+        queryset = Lesson.objects.filter(
             Q(module__course__status='published') |
             Q(module__course__instructor=user) |
-            Q(module__course__enrollments__student=user)
-        ).distinct()
+            Q(module__course_id__in=enrolled_course_ids(user))
+        ).annotate(
+            exercises_count=Count('exercises')
+        ).select_related('module__course__instructor')
+        if self.action == 'list':
+            queryset = queryset.defer(*LESSON_LIST_DEFERRED)
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -792,14 +915,15 @@ class LessonViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """Check if user can create lessons"""
         module = serializer.validated_data['module']
-        if module.course.instructor != self.request.user and not self.request.user.is_staff:
+        if module.course.instructor_id != self.request.user.pk and not self.request.user.is_staff:
             raise permissions.PermissionDenied("You can only create lessons for your own courses")
         serializer.save()
     
     def perform_update(self, serializer):
         """Check if user can update this lesson"""
-        lesson = self.get_object()
-        if lesson.module.course.instructor != self.request.user and not self.request.user.is_staff:
+        lesson = serializer.instance
+        user = self.request.user
+        if lesson.module.course.instructor_id != user.pk and not user.is_staff:
             raise permissions.PermissionDenied("You can only update lessons for your own courses")
         serializer.save()
     
@@ -815,22 +939,46 @@ class LessonViewSet(viewsets.ModelViewSet):
                 course=lesson.module.course
             )
             
-            progress, created = LessonProgress.objects.get_or_create(
-                enrollment=enrollment,
-                lesson=lesson,
-                defaults={'started_at': timezone.now()}
-            )
-            
-            if not progress.completed_at:
-                progress.completed_at = timezone.now()
-                progress.save()
+            now = timezone.now()
+            with transaction.atomic():
+                # INSERT ... ON CONFLICT DO NOTHING: adds the progress row if it's missing
+                # without a read first, and leaves an existing row to the update below
+                LessonProgress.objects.bulk_create(
+                    [LessonProgress(enrollment=enrollment, lesson=lesson, started_at=now)],
+                    ignore_conflicts=True
+                )
                 
-                # Update enrollment progress
-                enrollment.update_progress()
+                # Only the request that sets completed_at counts the completion
+                completed = LessonProgress.objects.filter(
+                    enrollment=enrollment, lesson=lesson, completed_at__isnull=True
+                ).update(
+                    status=LessonProgress.Status.COMPLETED,
+                    progress_percentage=100,
+                    completed_at=now
+                )
+                if not completed:
+                    return Response({'message': 'Lesson already completed'})
+                # Neither write above sends post_save, so retire the cached list counts here
+                invalidate_counts(LessonProgress)
                 
-                return Response({'message': 'Lesson marked as complete'})
-            else:
-                return Response({'message': 'Lesson already completed'})
+                CourseEnrollment.objects.filter(pk=enrollment.pk).update(
+                    lessons_completed=F('lessons_completed') + 1
+                )
+                # Profiles are created with the user; get_or_create only covers legacy accounts
+                profile_updates = {
+                    'total_lessons_completed': F('total_lessons_completed') + 1,
+                    'updated_at': now,
+                }
+                if not UserProfile.objects.filter(user=user).update(**profile_updates):
+                    UserProfile.objects.get_or_create(user=user)
+                    UserProfile.objects.filter(user=user).update(**profile_updates)
+                
+                # Recompute progress from the committed counters while the F() update still
+                # holds the enrollment row, so concurrent completions can't save a stale value
+                enrollment.refresh_from_db(fields=['lessons_completed', 'exercises_completed'])
+                enrollment.update_progress()
+            
+            return Response({'message': 'Lesson marked as complete'})
                 
         except CourseEnrollment.DoesNotExist:
             return Response(
@@ -850,14 +998,16 @@ class LessonViewSet(viewsets.ModelViewSet):
                 course=lesson.module.course
             )
             
+            # A new progress row starts out bookmarked; an existing one flips just that column
             progress, created = LessonProgress.objects.get_or_create(
                 enrollment=enrollment,
                 lesson=lesson,
-                defaults={'started_at': timezone.now()}
+                defaults={'started_at': timezone.now(), 'bookmarked': True}
             )
             
-            progress.bookmarked = not progress.bookmarked
-            progress.save()
+            if not created:
+                progress.bookmarked = not progress.bookmarked
+                progress.save(update_fields=['bookmarked', 'last_accessed'])
             
             action = 'bookmarked' if progress.bookmarked else 'unbookmarked'
             return Response({'message': f'Lesson {action} successfully'})
@@ -872,12 +1022,13 @@ class LessonViewSet(viewsets.ModelViewSet):
     def exercises(self, request, pk=None):
         """Get all exercises for this lesson"""
         lesson = self.get_object()
-        exercises = lesson.exercises.order_by('order')
-        serializer = ExerciseSerializer(exercises, many=True, context={'request': request})
-        return Response(serializer.data)
+        exercises = autoprefetch(
+            lesson.exercises.defer(*EXERCISE_LIST_DEFERRED).order_by('order'), ExerciseSerializer
+        )
+        return paginated_response(self, exercises, ExerciseSerializer)
 
 
-class ExerciseViewSet(viewsets.ModelViewSet):
+class ExerciseViewSet(AutoPrefetchViewSetMixin, viewsets.ModelViewSet):
     """API endpoints for exercises"""
     queryset = Exercise.objects.all()
     serializer_class = ExerciseSerializer
@@ -891,11 +1042,18 @@ class ExerciseViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter exercises based on lesson access"""
         user = self.request.user
-        return Exercise.objects.filter(
+        queryset = Exercise.objects.filter(
             Q(lesson__module__course__status='published') |
             Q(lesson__module__course__instructor=user) |
-            Q(lesson__module__course__enrollments__student=user)
-        ).distinct()
+            Q(lesson__module__course_id__in=enrolled_course_ids(user))
+        ).annotate(
+            # Read by the enrollment and ownership checks; the access filter already joins these
+            course_id=F('lesson__module__course_id'),
+            course_instructor_id=F('lesson__module__course__instructor_id')
+        )
+        if self.action == 'list':
+            queryset = queryset.defer(*EXERCISE_LIST_DEFERRED)
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -905,14 +1063,18 @@ class ExerciseViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """Check if user can create exercises"""
         lesson = serializer.validated_data['lesson']
-        if lesson.module.course.instructor != self.request.user and not self.request.user.is_staff:
+        # One lookup for the owner instead of lazily loading module, course and instructor
+        instructor_id = Lesson.objects.filter(pk=lesson.pk).values_list(
+            'module__course__instructor_id', flat=True
+        ).get()
+        if instructor_id != self.request.user.pk and not self.request.user.is_staff:
             raise permissions.PermissionDenied("You can only create exercises for your own courses")
         serializer.save()
     
     def perform_update(self, serializer):
         """Check if user can update this exercise"""
-        exercise = self.get_object()
-        if exercise.lesson.module.course.instructor != self.request.user and not self.request.user.is_staff:
+        exercise = serializer.instance
+        if exercise.course_instructor_id != self.request.user.pk and not self.request.user.is_staff:
             raise permissions.PermissionDenied("You can only update exercises for your own courses")
         serializer.save()
     
@@ -923,10 +1085,7 @@ class ExerciseViewSet(viewsets.ModelViewSet):
         user = request.user
         
         # Check if user is enrolled in the course
-        if not CourseEnrollment.objects.filter(
-            student=user,
-            course=exercise.lesson.module.course
-        ).exists():
+        if not CourseEnrollment.is_enrolled(user.pk, exercise.course_id):
             return Response(
                 {'error': 'You must be enrolled in the course to submit exercises'},
                 status=status.HTTP_403_FORBIDDEN
@@ -938,12 +1097,13 @@ class ExerciseViewSet(viewsets.ModelViewSet):
         )
         
         if serializer.is_valid():
-            submission = serializer.save()
-            
             # TODO: Integrate with code execution service
             # For now, just mark as submitted
-            submission.status = 'submitted'
-            submission.save()
+            try:
+                submission = serializer.save(status='submitted')
+            except AttemptLimitReached as exc:
+                # Checked under the exercise lock in save(); answer in this endpoint's shape
+                return Response({'error': str(exc.detail[0])}, status=status.HTTP_400_BAD_REQUEST)
             
             response_serializer = ExerciseSubmissionSerializer(
                 submission, 
@@ -960,10 +1120,7 @@ class ExerciseViewSet(viewsets.ModelViewSet):
         user = request.user
         
         # Check if user is enrolled in the course
-        if not CourseEnrollment.objects.filter(
-            student=user,
-            course=exercise.lesson.module.course
-        ).exists():
+        if not CourseEnrollment.is_enrolled(user.pk, exercise.course_id):
             return Response(
                 {'error': 'You must be enrolled in the course to test exercises'},
                 status=status.HTTP_403_FORBIDDEN
@@ -1010,7 +1167,7 @@ class ExerciseViewSet(viewsets.ModelViewSet):
         user = request.user
         
         # Check if user can provide feedback (instructor of the course)
-        if exercise.lesson.module.course.instructor != user and not user.is_staff:
+        if exercise.course_instructor_id != user.pk and not user.is_staff:
             return Response(
                 {'error': 'You can only provide feedback for your own courses'},
                 status=status.HTTP_403_FORBIDDEN
@@ -1045,10 +1202,11 @@ class ExerciseViewSet(viewsets.ModelViewSet):
         return Response({'message': 'Feedback provided successfully'})
 
 
-class CourseEnrollmentViewSet(viewsets.ReadOnlyModelViewSet):
+class CourseEnrollmentViewSet(AutoPrefetchViewSetMixin, viewsets.ReadOnlyModelViewSet):
     """API endpoints for course enrollments (read-only)"""
     queryset = CourseEnrollment.objects.all()
     serializer_class = CourseEnrollmentSerializer
+    pagination_class = CachedCountPagination
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_fields = ['status', 'course', 'enrollment_source']
@@ -1058,14 +1216,15 @@ class CourseEnrollmentViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         """Users can only see their own enrollments or enrollments in their courses"""
         user = self.request.user
-        if user.is_staff or (hasattr(user, 'can_teach') and user.can_teach):
+        if user.is_staff or getattr(user, 'can_teach', False):
             # Instructors can see enrollments for their courses
-            return CourseEnrollment.objects.filter(
+            queryset = CourseEnrollment.objects.filter(
                 Q(student=user) |
                 Q(course__instructor=user)
             )
         else:
-            return CourseEnrollment.objects.filter(student=user)
+            queryset = CourseEnrollment.objects.filter(student=user)
+        return queryset.select_related('course__instructor')
     
     @action(detail=True, methods=['get'])
     def progress_detail(self, request, pk=None):
@@ -1074,43 +1233,66 @@ class CourseEnrollmentViewSet(viewsets.ReadOnlyModelViewSet):
         user = request.user
         
         # Check permissions
-        if enrollment.student != user and enrollment.course.instructor != user and not user.is_staff:
+        if (
+            enrollment.student_id != user.pk
+            and enrollment.course.instructor_id != user.pk
+            and not user.is_staff
+        ):
             return Response(
                 {'error': 'Permission denied'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Get lesson progress
-        lesson_progress = LessonProgress.objects.filter(
-            enrollment=enrollment
-        ).select_related('lesson')
-        
-        # Get exercise submissions
-        exercise_submissions = ExerciseSubmission.objects.filter(
-            student=enrollment.student,
-            exercise__lesson__module__course=enrollment.course
-        ).select_related('exercise')
-        
+        # Each list is fetched once, eager-loaded for its serializer; the summary is
+        # computed from the loaded rows instead of re-querying them
+        lesson_progress = list(autoprefetch(
+            LessonProgress.objects.filter(enrollment=enrollment).defer(
+                *(f'lesson__{name}' for name in LESSON_LIST_DEFERRED)
+            ),
+            LessonProgressSerializer
+        ))
+        exercise_submissions = list(autoprefetch(
+            ExerciseSubmission.objects.filter(
+                student_id=enrollment.student_id,
+                exercise__lesson__module__course_id=enrollment.course_id
+            ).defer(*(f'exercise__{name}' for name in EXERCISE_LIST_DEFERRED)),
+            ExerciseSubmissionSerializer
+        ))
+        scores = [
+            submission.score for submission in exercise_submissions if submission.score is not None
+        ]
+        
+        context = {'request': request}
         progress_data = {
-            'enrollment': CourseEnrollmentSerializer(enrollment, context={'request': request}).data,
-            'lessons_progress': LessonProgressSerializer(lesson_progress, many=True, context={'request': request}).data,
-            'exercise_submissions': ExerciseSubmissionSerializer(exercise_submissions, many=True, context={'request': request}).data,
+            'enrollment': CourseEnrollmentSerializer(enrollment, context=context).data,
+            'lessons_progress': LessonProgressSerializer(
+                lesson_progress, many=True, context=context
+            ).data,
+            'exercise_submissions': ExerciseSubmissionSerializer(
+                exercise_submissions, many=True, context=context
+            ).data,
             'summary': {
-                'total_lessons': enrollment.course.get_total_lessons(),
-                'completed_lessons': lesson_progress.filter(completed_at__isnull=False).count(),
-                'total_exercises': enrollment.course.get_total_exercises(),
-                'completed_exercises': exercise_submissions.filter(status='passed').count(),
-                'average_score': exercise_submissions.aggregate(avg=Avg('score'))['avg'] or 0,
+                'total_lessons': enrollment.course.total_lessons,
+                'completed_lessons': sum(
+                    1 for progress in lesson_progress if progress.completed_at is not None
+                ),
+                'total_exercises': enrollment.course.total_exercises,
+                'completed_exercises': sum(
+                    1 for submission in exercise_submissions
+                    if submission.status == ExerciseSubmission.Status.PASSED
+                ),
+                'average_score': sum(scores) / len(scores) if scores else 0,
             }
         }
         
         return Response(progress_data)
 
 
-class LessonProgressViewSet(viewsets.ReadOnlyModelViewSet):
+class LessonProgressViewSet(AutoPrefetchViewSetMixin, viewsets.ReadOnlyModelViewSet):
     """API endpoints for lesson progress (read-only)"""
     queryset = LessonProgress.objects.all()
     serializer_class = LessonProgressSerializer
+    pagination_class = CachedCountPagination
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_fields = ['enrollment', 'lesson']
@@ -1120,20 +1302,23 @@ class LessonProgressViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         """Users can only see their own progress or progress in their courses"""
         user = self.request.user
-        if user.is_staff or (hasattr(user, 'can_teach') and user.can_teach):
+        if user.is_staff or getattr(user, 'can_teach', False):
             # Instructors can see progress for their courses
-            return LessonProgress.objects.filter(
+            queryset = LessonProgress.objects.filter(
                 Q(enrollment__student=user) |
                 Q(enrollment__course__instructor=user)
             )
         else:
-            return LessonProgress.objects.filter(enrollment__student=user)
+            queryset = LessonProgress.objects.filter(enrollment__student=user)
+        queryset = queryset.select_related('lesson__module', 'enrollment__course')
+        return queryset.defer(*(f'lesson__{name}' for name in LESSON_LIST_DEFERRED))
 
 
-class ExerciseSubmissionViewSet(viewsets.ReadOnlyModelViewSet):
+class ExerciseSubmissionViewSet(AutoPrefetchViewSetMixin, viewsets.ReadOnlyModelViewSet):
     """API endpoints for exercise submissions (read-only)"""
     queryset = ExerciseSubmission.objects.all()
     serializer_class = ExerciseSubmissionSerializer
+    pagination_class = CachedCountPagination
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_fields = ['status', 'exercise', 'auto_graded', 'is_final_submission']
@@ -1143,14 +1328,26 @@ class ExerciseSubmissionViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         """Users can only see their own submissions or submissions to their exercises"""
         user = self.request.user
-        if user.is_staff or (hasattr(user, 'can_teach') and user.can_teach):
+        if user.is_staff or getattr(user, 'can_teach', False):
             # Instructors can see submissions to their exercises
-            return ExerciseSubmission.objects.filter(
+            queryset = ExerciseSubmission.objects.filter(
                 Q(student=user) |
                 Q(exercise__lesson__module__course__instructor=user)
             )
         else:
-            return ExerciseSubmission.objects.filter(student=user)
+            queryset = ExerciseSubmission.objects.filter(student=user)
+        queryset = queryset.select_related(
+            'student', 'exercise__lesson__module__course__instructor'
+        )
+        return queryset.defer(*(f'exercise__{name}' for name in EXERCISE_LIST_DEFERRED))
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream every matching submission as one JSON array"""
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer(many=True)
+        rows = serializer.iter_representation(queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE))
+        return StreamingHttpResponse(stream_json_array(rows), content_type='application/json')
     
     @action(detail=True, methods=['post'])
     def provide_feedback(self, request, pk=None):
@@ -1159,7 +1356,7 @@ class ExerciseSubmissionViewSet(viewsets.ReadOnlyModelViewSet):
         user = request.user
         
         # Check if user can provide feedback
-        if submission.exercise.lesson.module.course.instructor != user and not user.is_staff:
+        if submission.exercise.lesson.module.course.instructor_id != user.pk and not user.is_staff:
             return Response(
                 {'error': 'You can only provide feedback for your own courses'},
                 status=status.HTTP_403_FORBIDDEN
@@ -1182,7 +1379,7 @@ class ExerciseSubmissionViewSet(viewsets.ReadOnlyModelViewSet):
         return Response({'message': 'Feedback provided successfully'})
 
 
-class CourseRatingViewSet(viewsets.ModelViewSet):
+class CourseRatingViewSet(AutoPrefetchViewSetMixin, viewsets.ModelViewSet):
     """API endpoints for course ratings and reviews"""
     queryset = CourseRating.objects.all()
     serializer_class = CourseRatingSerializer
@@ -1195,14 +1392,15 @@ class CourseRatingViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter based on permissions"""
         user = self.request.user
-        if user.is_staff or (hasattr(user, 'can_teach') and user.can_teach):
+        if user.is_staff or getattr(user, 'can_teach', False):
             # Instructors can see reviews for their courses
-            return CourseRating.objects.filter(
+            queryset = CourseRating.objects.filter(
                 Q(student=user) |
                 Q(course__instructor=user)
             )
         else:
-            return CourseRating.objects.filter(student=user)
+            queryset = CourseRating.objects.filter(student=user)
+        return queryset
     
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -1210,7 +1408,17 @@ class CourseRatingViewSet(viewsets.ModelViewSet):
         return CourseRatingSerializer
     
     def perform_create(self, serializer):
-        serializer.save(student=self.request.user)
+        with transaction.atomic():
+            course = serializer.validated_data.get('course')
+            if course is not None:
+                lock_course(course.pk)
+            serializer.save(student=self.request.user)
+    
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            # Take the lock before the rating signals re-read the stored rating
+            lock_course(serializer.instance.course_id)
+            serializer.save()
 
 
 # =============================================================================
@@ -1335,6 +1543,80 @@ class BulkOperationsViewSet(viewsets.ViewSet):
                 'graded_count': updated_count
             })
         
+        if action == 'import':
+            try:
+                exercise = Exercise.objects.select_related('lesson__module__course').get(
+                    id=data.get('exercise_id'),
+                    lesson__module__course__instructor=request.user
+                )
+            except (Exercise.DoesNotExist, DjangoValidationError):
+                return Response(
+                    {'error': 'Exercise not found or permission denied'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+            serializer = ImportExerciseSubmissionSerializer(
+                data=data.get('submissions', []), many=True
+            )
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            
+            student_ids = {entry['student_id'] for entry in serializer.validated_data}
+            enrolled = set(CourseEnrollment.objects.filter(
+                course=exercise.lesson.module.course,
+                student_id__in=student_ids
+            ).values_list('student_id', flat=True))
+            if student_ids - enrolled:
+                return Response(
+                    {'error': 'All students must be enrolled in the course'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            with transaction.atomic():
+                # Same lock and numbering as a single submit, so imports and live submits
+                # never share an attempt number or slip past the attempt limit together
+                max_attempts = Exercise.objects.select_for_update().values_list(
+                    'max_attempts', flat=True
+                ).get(pk=exercise.pk)
+                attempts = dict(ExerciseSubmission.objects.filter(
+                    exercise=exercise, student_id__in=student_ids
+                ).order_by().values('student_id').annotate(
+                    last=Max('attempt_number')
+                ).values_list('student_id', 'last'))
+                
+                submissions = []
+                for validated in serializer.validated_data:
+                    student_id = validated.pop('student_id')
+                    attempts[student_id] = attempts.get(student_id, 0) + 1
+                    submissions.append(ExerciseSubmission(
+                        student_id=student_id,
+                        exercise=exercise,
+                        attempt_number=attempts[student_id],
+                        **validated
+                    ))
+                
+                if max_attempts:
+                    over_limit = sorted(
+                        str(student_id) for student_id, last in attempts.items()
+                        if last > max_attempts
+                    )
+                    if over_limit:
+                        return Response({
+                            'error': 'Maximum number of attempts reached',
+                            'student_ids': over_limit
+                        }, status=status.HTTP_400_BAD_REQUEST)
+                
+                ExerciseSubmission.objects.bulk_create(
+                    submissions, batch_size=SUBMISSION_BATCH_SIZE
+                )
+                # bulk_create sends no post_save, so retire the cached list counts here
+                invalidate_counts(ExerciseSubmission)
+            
+            return Response({
+                'message': f'Imported {len(submissions)} submissions',
+                'imported_count': len(submissions)
+            }, status=status.HTTP_201_CREATED)
+        
         return Response(
             {'error': 'Invalid action'},
             status=status.HTTP_400_BAD_REQUEST
@@ -1384,7 +1666,8 @@ class AdvancedSearchViewSet(viewsets.ViewSet):
         if instructor_id:
             courses = courses.filter(instructor_id=instructor_id)
         
-        courses = courses.order_by('-created_at')[:20]  # Limit results
+        # Limit results
+        courses = autoprefetch(courses, CourseSerializer).order_by('-created_at')[:20]
         
         serializer = CourseSerializer(courses, many=True, context={'request': request})
         return Response(serializer.data)
@@ -1393,7 +1676,7 @@ class AdvancedSearchViewSet(viewsets.ViewSet):
     def students(self, request):
         """Search students (instructor only)"""
         if not (request.user.is_authenticated and 
-                (request.user.is_staff or (hasattr(request.user, 'can_teach') and request.user.can_teach))):
+                (request.user.is_staff or getattr(request.user, 'can_teach', False))):
             return Response(
                 {'error': 'Permission denied'},
                 status=status.HTTP_403_FORBIDDEN
@@ -1441,7 +1724,7 @@ class AdvancedSearchViewSet(viewsets.ViewSet):
     def submissions(self, request):
         """Search exercise submissions (instructor only)"""
         if not (request.user.is_authenticated and 
-                (request.user.is_staff or (hasattr(request.user, 'can_teach') and request.user.can_teach))):
+                (request.user.is_staff or getattr(request.user, 'can_teach', False))):
             return Response(
                 {'error': 'Permission denied'},
                 status=status.HTTP_403_FORBIDDEN
@@ -1466,7 +1749,9 @@ class AdvancedSearchViewSet(viewsets.ViewSet):
                 Q(submitted_code__icontains=query)
             )
         
-        submissions = submissions.order_by('-submitted_at')[:20]
+        submissions = autoprefetch(
+            submissions, ExerciseSubmissionSerializer
+        ).order_by('-submitted_at')[:20]
         
         serializer = ExerciseSubmissionSerializer(submissions, many=True, context={'request': request})
         return Response(serializer.data)
\ No newline at end of file
@@ -0,0 +1,42 @@
+# utils/db_routers.py
+"""Database routing for read-replica traffic"""
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+REPLICA_DB = 'replica'
+
+# Alias reads should use for the request being handled, set by ``use_replica``
+_read_db = ContextVar('read_db', default=None)
+
+
+def use_replica(view):
+    """Serve the view's GET/HEAD reads from the replica when one is configured"""
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or REPLICA_DB not in settings.DATABASES:
+            return view(request, *args, **kwargs)
+        token = _read_db.set(REPLICA_DB)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _read_db.reset(token)
+    return wrapped
+
+
+class ReplicaRouter:
+    """Sends reads to the alias chosen for the current request; everything else stays on default"""
+    
+    def db_for_read(self, model, **hints):
+        return _read_db.get()
+    
+    def db_for_write(self, model, **hints):
+        return None
+    
+    def allow_relation(self, obj1, obj2, **hints):
+        return None
+    
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is fed by the primary, never migrated directly
+        return False if db == REPLICA_DB else None
@@ -0,0 +1,88 @@
+# utils/pagination.py
+"""Pagination classes shared across apps"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+
+# Seconds a list's total row count is reused across page fetches
+COUNT_CACHE_TIMEOUT = 60 * 5
+
+
+def count_cache_prefix(model):
+    """Cache key prefix shared by every cached count of ``model``'s lists"""
+    return f'pagination-count:{model._meta.label_lower}'
+
+
+def _count_version_key(model):
+    return f'{count_cache_prefix(model)}:version'
+
+
+def count_cache_version(model):
+    """Current generation of ``model``'s cached counts; part of every count key"""
+    # Seeded from the clock so a version evicted from the cache never restarts at an
+    # old generation whose count keys may still be cached
+    return cache.get_or_set(_count_version_key(model), time.time_ns, None)
+
+
+def invalidate_counts(model):
+    """Retire the cached list counts of ``model`` once the current transaction commits
+    
+    Bumping the version orphans every count key at once without scanning the keyspace,
+    and doing it on commit keeps readers from re-caching the pre-commit count.
+    """
+    def bump():
+        try:
+            cache.incr(_count_version_key(model))
+        except ValueError:
+            cache.set(_count_version_key(model), time.time_ns(), None)
+    
+    transaction.on_commit(bump)
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator that reads its total count from the cache when given a key"""
+    
+    def __init__(self, object_list, per_page, cache_key=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+    
+    @cached_property
+    def count(self):
+        if self.cache_key is None:
+            return super().count
+        return cache.get_or_set(
+            self.cache_key, lambda: super(CachedCountPaginator, self).count, COUNT_CACHE_TIMEOUT
+        )
+
+
+class CachedCountPagination(PageNumberPagination):
+    """PageNumberPagination that skips the COUNT(*) on repeat fetches of the same list
+    
+    The key hashes the list's SQL, so it already covers the requesting user's
+    filters, search and ordering; page number and size don't affect it.
+    """
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_cache_key = self.get_count_cache_key(queryset)
+        return super().paginate_queryset(queryset, request, view)
+    
+    def get_count_cache_key(self, queryset):
+        query = getattr(queryset, 'query', None)
+        if query is None:
+            return None
+        try:
+            sql = str(query)
+        except EmptyResultSet:
+            return None
+        digest = hashlib.md5(sql.encode()).hexdigest()
+        version = count_cache_version(queryset.model)
+        return f'{count_cache_prefix(queryset.model)}:{version}:{digest}'
+    
+    def django_paginator_class(self, object_list, per_page):
+        return CachedCountPaginator(object_list, per_page, cache_key=self.count_cache_key)
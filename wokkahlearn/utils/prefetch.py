@@ -0,0 +1,76 @@
+# utils/prefetch.py
+"""Derive select_related/prefetch_related lookups from serializer fields"""
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+def _collect_lookups(serializer, model, prefix, select, prefetch, in_prefetch):
+    """Walk a serializer's fields and classify each relation it renders"""
+    for field in serializer.fields.values():
+        if field.source == '*' or isinstance(field, serializers.SerializerMethodField):
+            continue
+        
+        try:
+            model_field = model._meta.get_field(field.source.split('.')[0])
+        except FieldDoesNotExist:
+            continue
+        
+        if not model_field.is_relation:
+            continue
+        
+        # Primary key relations render from the local ``<name>_id`` column
+        if isinstance(field, serializers.RelatedField) and field.use_pk_only_optimization():
+            continue
+        
+        path = f'{prefix}{model_field.name}'
+        if model_field.many_to_many or model_field.one_to_many:
+            prefetch.add(path)
+            nested_in_prefetch = True
+        else:
+            (prefetch if in_prefetch else select).add(path)
+            nested_in_prefetch = in_prefetch
+        
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if isinstance(nested, serializers.ModelSerializer):
+            _collect_lookups(
+                nested, model_field.related_model, f'{path}__',
+                select, prefetch, nested_in_prefetch
+            )
+
+
+@lru_cache(maxsize=None)
+def related_lookups(serializer_class):
+    """Return ``(select_related, prefetch_related)`` lookups for a ModelSerializer"""
+    select, prefetch = set(), set()
+    _collect_lookups(
+        serializer_class(), serializer_class.Meta.model, '',
+        select, prefetch, in_prefetch=False
+    )
+    return tuple(sorted(select)), tuple(sorted(prefetch))
+
+
+def autoprefetch(queryset, serializer_class):
+    """Eager-load every relation ``serializer_class`` will read from ``queryset``"""
+    if not issubclass(serializer_class, serializers.ModelSerializer):
+        return queryset
+    
+    select, prefetch = related_lookups(serializer_class)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    
+    # Serializers declare loading their method fields need, which fields alone can't show
+    setup_eager_loading = getattr(serializer_class, 'setup_eager_loading', None)
+    if setup_eager_loading is not None:
+        queryset = setup_eager_loading(queryset)
+    return queryset
+
+
+class AutoPrefetchViewSetMixin:
+    """Eager-load whatever the action's serializer renders, for every list and object lookup"""
+    
+    def filter_queryset(self, queryset):
+        return autoprefetch(super().filter_queryset(queryset), self.get_serializer_class())
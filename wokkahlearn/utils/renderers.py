@@ -0,0 +1,63 @@
+# utils/renderers.py
+"""JSON renderers for API responses"""
+import csv
+import logging
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logger.warning("orjson not available, falling back to the stdlib JSON encoder")
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is installed"""
+    encoder = encoders.JSONEncoder()
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Indented (browsable/debug) output keeps the stock encoder
+        if not ORJSON_AVAILABLE or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        if data is None:
+            return b''
+        
+        ret = orjson.dumps(
+            data,
+            default=self.encoder.default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        )
+        # Match JSONRenderer, which escapes these so output is valid javascript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+def stream_json_array(rows, renderer=None):
+    """Encode an iterable of rows as a JSON array, one chunk per row"""
+    renderer = renderer or FastJSONRenderer()
+    yield b'['
+    for index, row in enumerate(rows):
+        if index:
+            yield b','
+        yield renderer.render(row)
+    yield b']'
+
+
+class _Echo:
+    """File-like object whose write() returns the line instead of storing it"""
+    
+    def write(self, value):
+        return value
+
+
+def stream_csv(header, rows):
+    """Encode ``header`` and an iterable of row tuples as CSV, one chunk per row"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
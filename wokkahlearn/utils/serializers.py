@@ -0,0 +1,165 @@
+# utils/serializers.py
+"""Serializer helpers shared across apps"""
+import copy
+from operator import attrgetter
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.utils.functional import cached_property
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import PKOnlyObject
+
+
+def _is_plain_column(field, model):
+    """Whether ``field`` only reads one concrete, non-relational model column"""
+    if isinstance(field, (
+        serializers.BaseSerializer, serializers.RelatedField,
+        serializers.ManyRelatedField, serializers.SerializerMethodField
+    )):
+        return False
+    if len(field.source_attrs) != 1:
+        return False
+    try:
+        model_field = model._meta.get_field(field.source)
+    except FieldDoesNotExist:
+        return False
+    return model_field.concrete and not model_field.is_relation
+
+
+class FastListSerializer(serializers.ListSerializer):
+    """ListSerializer with a flatter per-row loop for plain serializer children
+
+    The child's readable fields are resolved once per list and each row is
+    built as a plain dict rather than an OrderedDict. Children that override
+    ``to_representation`` keep their own path.
+    """
+
+    def to_representation(self, data):
+        return list(self.iter_representation(data))
+
+    def iter_representation(self, data):
+        """Yield each row's representation without building the whole list"""
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        child = self.child
+        if type(child).to_representation is not serializers.Serializer.to_representation:
+            for item in iterable:
+                yield child.to_representation(item)
+            return
+
+        # Plain column fields are read together by one attrgetter per row
+        model = getattr(getattr(child, 'Meta', None), 'model', None)
+        plan, plain_sources = [], []
+        for field in child._readable_fields:
+            if model is not None and _is_plain_column(field, model):
+                plan.append((field, len(plain_sources)))
+                plain_sources.append(field.source)
+            else:
+                plan.append((field, None))
+        plan = tuple(plan)
+        read_plain = attrgetter(*plain_sources) if plain_sources else None
+        single_plain = len(plain_sources) == 1
+
+        for instance in iterable:
+            if read_plain is not None:
+                plain_values = read_plain(instance)
+                if single_plain:
+                    plain_values = (plain_values,)
+
+            row = {}
+            for field, index in plan:
+                if index is not None:
+                    value = plain_values[index]
+                    row[field.field_name] = (
+                        None if value is None else field.to_representation(value)
+                    )
+                    continue
+
+                try:
+                    attribute = field.get_attribute(instance)
+                except SkipField:
+                    continue
+
+                check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+                if check_for_none is None:
+                    row[field.field_name] = None
+                else:
+                    row[field.field_name] = field.to_representation(attribute)
+            yield row
+
+
+# Pristine field sets per serializer class; never bound, only copied
+_FIELDS_CACHE = {}
+
+
+class CachedFieldsMixin:
+    """Builds a serializer class's fields once and gives each instance cheap copies
+    
+    ``get_fields`` deep-copies every declared field and rebuilds the model
+    fields on each instantiation. Here that happens once per class; instances
+    get shallow copies, which ``bind()`` then fills in. List fields are still
+    deep-copied so each copy owns (and binds) its own child.
+    """
+    
+    def get_fields(self):
+        cls = type(self)
+        fields = _FIELDS_CACHE.get(cls)
+        if fields is None:
+            fields = _FIELDS_CACHE[cls] = super().get_fields()
+        return {
+            name: (
+                copy.deepcopy(field) if isinstance(field, serializers.ListSerializer)
+                else copy.copy(field)
+            )
+            for name, field in fields.items()
+        }
+
+
+class SparseFieldsMixin:
+    """Renders only the fields named in the request's ``?fields=``
+    
+    Applies to the top-level serializer or a top-level list's child on safe
+    requests; nested serializers keep their full shape. Unknown names are
+    ignored, and a list naming no known field renders everything.
+    """
+    
+    @cached_property
+    def sparse_fields(self):
+        """Requested field names, or None for the full representation"""
+        parent = getattr(self, 'parent', None)
+        if isinstance(parent, serializers.ListSerializer):
+            parent = getattr(parent, 'parent', None)
+        if parent is not None:
+            return None
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        requested = request.query_params.get('fields', '')
+        return frozenset(name.strip() for name in requested.split(',') if name.strip()) or None
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.sparse_fields and not self.sparse_fields.isdisjoint(fields):
+            fields = {name: field for name, field in fields.items() if name in self.sparse_fields}
+        return fields
+
+
+class ContextCachedSerializer(serializers.ModelSerializer):
+    """ModelSerializer that resolves the request and its user once per instance
+
+    A list's child serializer is reused for every row, so method fields read
+    ``self._user``/``self._is_auth`` instead of walking the context each time.
+    """
+
+    @cached_property
+    def _request(self):
+        return self.context.get('request')
+
+    @cached_property
+    def _user(self):
+        return getattr(self._request, 'user', None)
+
+    @cached_property
+    def _is_auth(self):
+        return bool(self._user and self._user.is_authenticated)
@@ -107,6 +107,19 @@ if not os.getenv('DB_PASSWORD') and DEBUG:
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 
+# Optional read replica, used by the read-heavy list routes (see utils.db_routers)
+if (
+    os.getenv('DB_REPLICA_HOST')
+    and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql'
+):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+    }
+
+DATABASE_ROUTERS = ['utils.db_routers.ReplicaRouter']
+
 print(f"Database config: {DATABASES['default']['ENGINE']} - {DATABASES['default']['NAME']}")
 
 # Redis configuration
@@ -148,6 +161,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'utils.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',